@@ -0,0 +1,310 @@
+# -*- coding: utf-8 -*-
+"""SensorThings API Plugin
+
+Description
+-----------
+
+Persistent on-disk cache of Frost server data pages.
+
+Libraries/Modules
+-----------------
+
+- sqlite3 (standard library).
+
+Notes
+-----
+
+- One SQLite database per server; each dataset (request url) stores
+  the raw JSON pages together with its validators (ETag, Last-Modified,
+  row count and max @iot.id) and the time it was saved.
+- Pages of an interrupted load are kept (incomplete dataset), so the
+  next load can resume after the last stored page.
+- Each load writes its pages under its own load id: pages of a superseded
+  load (canceled, or restarted by another load of the same url) are not
+  stored, and an incomplete dataset is not resumed while another load of
+  the url is running in this process.
+- Each completed load purges the datasets of its server database not saved
+  for a long time (settings) and, over the size limit, the least recently
+  saved ones.
+
+
+Author(s)
+---------
+
+- Created by the SensorThingsAPI plugin contributors on 18/10/2026,
+  as part of the Frost provider performance work.
+
+Members
+-------
+"""
+import os
+import re
+import json
+import time
+import uuid
+import sqlite3
+import threading
+import urllib.parse
+from contextlib import contextmanager
+
+from qgis.core import QgsApplication, QgsSettings
+
+
+#: Constant for cache settings key prefix
+__FROST_CACHE_SETTINGS__ = 'frost/cache'
+
+#: Constant for default time to live of cached data (seconds)
+__FROST_CACHE_DEFAULT_TTL__ = 3600
+
+#: Constant for default maximum age of cached data before purging (seconds)
+__FROST_CACHE_DEFAULT_MAX_AGE__ = 7 * 24 * 3600
+
+#: Constant for default maximum size of cached pages of a server (MB)
+__FROST_CACHE_DEFAULT_MAX_SIZE__ = 512
+
+#
+#-----------------------------------------------------------
+class FrostCacheEntry:
+    """Cached dataset header"""
+
+    def __init__(self, url, etag, last_modified, row_count, max_id, saved_at, complete=True):
+        """Constructor"""
+        self.url = url
+        self.etag = etag or ''
+        self.last_modified = last_modified or ''
+        self.row_count = row_count
+        self.max_id = max_id
+        self.saved_at = saved_at
+        self.complete = complete
+
+    @property
+    def age(self) -> float:
+        """Returns the age of cached data in seconds"""
+        return time.time() - self.saved_at
+
+#
+#-----------------------------------------------------------
+class FrostLocationCache:
+    """Persistent cache of Frost data pages (one database per server)"""
+
+    _lock = threading.RLock()
+    # url => load id of the loads running in this process
+    _running = {}
+
+    def __init__(self, cache_dir: str=None):
+        """Constructor"""
+        self._cache_dir = cache_dir or os.path.join(
+            QgsApplication.qgisSettingsDirPath(), 'cache', 'SensorThingsAPI')
+
+    @staticmethod
+    def enabled() -> bool:
+        """Returns true if the cache is enabled in settings"""
+        value = QgsSettings().value(f"{__FROST_CACHE_SETTINGS__}/enabled", True)
+        return str(value).lower() not in ('false', '0', 'no')
+
+    @staticmethod
+    def ttl() -> int:
+        """Returns the time to live of cached data in seconds"""
+        try:
+            return int(QgsSettings().value(f"{__FROST_CACHE_SETTINGS__}/ttl", __FROST_CACHE_DEFAULT_TTL__))
+        except (TypeError, ValueError):
+            return __FROST_CACHE_DEFAULT_TTL__
+
+    @staticmethod
+    def maxAge() -> int:
+        """Returns the age in seconds after which cached data are purged"""
+        try:
+            return int(QgsSettings().value(f"{__FROST_CACHE_SETTINGS__}/maxAge", __FROST_CACHE_DEFAULT_MAX_AGE__))
+        except (TypeError, ValueError):
+            return __FROST_CACHE_DEFAULT_MAX_AGE__
+
+    @staticmethod
+    def maxSize() -> int:
+        """Returns the maximum size of cached pages of a server in bytes"""
+        try:
+            size = int(QgsSettings().value(f"{__FROST_CACHE_SETTINGS__}/maxSize", __FROST_CACHE_DEFAULT_MAX_SIZE__))
+        except (TypeError, ValueError):
+            size = __FROST_CACHE_DEFAULT_MAX_SIZE__
+        return size * 1024 * 1024
+
+    def entry(self, url: str):
+        """Returns the cached dataset header of an url, None if not cached"""
+        with self._lock, self._connect(url) as conn:
+            rec = conn.execute(
+                "SELECT url, etag, last_modified, row_count, max_id, saved_at "
+                "FROM datasets WHERE url = ? AND complete = 1", (url,)).fetchone()
+        if not rec:
+            return None
+        url, etag, last_modified, row_count, max_id, saved_at = rec
+        return FrostCacheEntry(url, etag, last_modified, row_count, json.loads(max_id or 'null'), saved_at)
+
+    def partial(self, url: str):
+        """Returns the dataset header of an interrupted load of an url, 
+           None if there are no stored pages to resume from (or if another
+           load of the url is still running)"""
+        with self._lock, self._connect(url) as conn:
+            if url in self._running:
+                return None
+            rec = conn.execute(
+                "SELECT d.url, d.etag, d.last_modified, d.row_count, d.max_id, d.saved_at "
+                "FROM datasets d WHERE d.url = ? AND d.complete = 0 AND "
+                "EXISTS (SELECT 1 FROM pages p WHERE p.url = d.url AND p.load_id = d.load_id)", 
+                (url,)).fetchone()
+        if not rec:
+            return None
+        url, etag, last_modified, row_count, max_id, saved_at = rec
+        return FrostCacheEntry(url, etag, last_modified, row_count, json.loads(max_id or 'null'), saved_at, False)
+
+    def pages(self, url: str):
+        """Yields the cached raw JSON pages of an url, one at a time
+           (each page is read with its own short statement, so no read 
+           lock is held on the database while the caller parses it)"""
+        with self._lock, self._connect(url) as conn:
+            rec = conn.execute("SELECT load_id FROM datasets WHERE url = ?", (url,)).fetchone()
+            load_id = rec[0] if rec else None
+            page_numbers = [rec[0] for rec in conn.execute(
+                "SELECT page FROM pages WHERE url = ? AND load_id = ? ORDER BY page", (url, load_id))]
+        for page in page_numbers:
+            with self._lock, self._connect(url) as conn:
+                rec = conn.execute(
+                    "SELECT data FROM pages WHERE url = ? AND page = ? AND load_id = ?", 
+                    (url, page, load_id)).fetchone()
+            if rec is None:
+                # pages rewritten meanwhile
+                return
+            yield rec[0]
+
+    def begin(self, url: str) -> str:
+        """Starts (re)writing the cached pages of an url, returns the 
+           id of the new load (superseding any other load of the url)"""
+        load_id = uuid.uuid4().hex
+        with self._lock, self._connect(url) as conn:
+            conn.execute("DELETE FROM pages WHERE url = ?", (url,))
+            conn.execute(
+                "INSERT OR REPLACE INTO datasets "
+                "(url, etag, last_modified, row_count, max_id, saved_at, complete, load_id) "
+                "VALUES (?, '', '', 0, 'null', ?, 0, ?)", (url, time.time(), load_id))
+            self._running[url] = load_id
+        return load_id
+
+    def resume(self, url: str):
+        """Continues an interrupted load of an url with a new load id,
+           returns None if another load of the url is running"""
+        load_id = uuid.uuid4().hex
+        with self._lock, self._connect(url) as conn:
+            if url in self._running:
+                return None
+            conn.execute(
+                "UPDATE pages SET load_id = ? WHERE url = ? AND "
+                "load_id = (SELECT load_id FROM datasets WHERE url = ?)", (load_id, url, url))
+            conn.execute("UPDATE datasets SET load_id = ? WHERE url = ?", (load_id, url))
+            self._running[url] = load_id
+        return load_id
+
+    @classmethod
+    def end(cls, url: str, load_id: str):
+        """Marks a load of an url as no more running (completed or not)"""
+        with cls._lock:
+            if cls._running.get(url) == load_id:
+                del cls._running[url]
+
+    def addPage(self, url: str, load_id: str, page: int, data: bytes) -> bool:
+        """Stores a raw JSON page of a load of an url, returns false
+           (nothing stored) if the load has been superseded"""
+        with self._lock, self._connect(url) as conn:
+            cursor = conn.execute(
+                "INSERT OR REPLACE INTO pages (url, page, data, load_id) "
+                "SELECT ?, ?, ?, ? WHERE EXISTS "
+                "(SELECT 1 FROM datasets WHERE url = ? AND load_id = ? AND complete = 0)",
+                (url, page, sqlite3.Binary(data), load_id, url, load_id))
+            return cursor.rowcount > 0
+
+    def setValidators(self, url: str, load_id: str, etag: str='', last_modified: str=''):
+        """Stores the validators of the first page of a load of an url"""
+        with self._lock, self._connect(url) as conn:
+            conn.execute(
+                "UPDATE datasets SET etag = ?, last_modified = ? WHERE url = ? AND load_id = ?",
+                (etag or '', last_modified or '', url, load_id))
+
+    def finish(self, url: str, load_id: str, etag: str='', last_modified: str='', row_count: int=0, max_id=None) -> bool:
+        """Marks the cached pages of a load of an url as complete, with 
+           their validators; returns false if the load has been superseded"""
+        with self._lock, self._connect(url) as conn:
+            cursor = conn.execute(
+                "UPDATE datasets SET etag = ?, last_modified = ?, row_count = ?, "
+                "max_id = ?, saved_at = ?, complete = 1 WHERE url = ? AND load_id = ? AND complete = 0",
+                (etag or '', last_modified or '', row_count, json.dumps(max_id), time.time(), url, load_id))
+            if cursor.rowcount == 0:
+                return False
+            conn.execute("DELETE FROM pages WHERE url = ? AND load_id <> ?", (url, load_id))
+        self.purge(url)
+        return True
+
+    def purge(self, url: str):
+        """Removes expired datasets from the database of an url and, 
+           over the size limit, the least recently saved ones (except the url)"""
+        now = time.time()
+        with self._lock, self._connect(url) as conn:
+            # expired data and interrupted loads no more resumable
+            # (loads running in this process are kept)
+            running = list(self._running)
+            conn.execute(
+                "DELETE FROM datasets WHERE url <> ? AND url NOT IN ({}) AND "
+                "((complete = 1 AND saved_at < ?) OR (complete = 0 AND saved_at < ?))".format(
+                    ', '.join('?' * len(running))),
+                (url, *running, now - self.maxAge(), now - self.ttl()))
+            # size limit
+            max_size = self.maxSize()
+            sizes = conn.execute(
+                "SELECT d.url, d.complete, COALESCE(SUM(LENGTH(p.data)), 0) FROM datasets d "
+                "LEFT JOIN pages p ON p.url = d.url AND p.load_id = d.load_id "
+                "GROUP BY d.url ORDER BY d.url = ? DESC, d.saved_at DESC", (url,)).fetchall()
+            total_size = 0
+            removed = []
+            for dataset_url, complete, size in sizes:
+                total_size += size
+                # (loads in progress are kept)
+                if total_size > max_size and complete and dataset_url != url:
+                    removed.append((dataset_url,))
+            conn.executemany("DELETE FROM datasets WHERE url = ?", removed)
+            # pages of removed datasets and of superseded loads
+            conn.execute(
+                "DELETE FROM pages WHERE NOT EXISTS (SELECT 1 FROM datasets d "
+                "WHERE d.url = pages.url AND d.load_id = pages.load_id)")
+
+    def touch(self, url: str):
+        """Marks cached data of an url as revalidated now"""
+        with self._lock, self._connect(url) as conn:
+            conn.execute("UPDATE datasets SET saved_at = ? WHERE url = ?", (time.time(), url))
+
+    def _databasePath(self, url: str) -> str:
+        """Returns the database file path for the server of an url"""
+        netloc = urllib.parse.urlparse(url).netloc or 'local'
+        name = re.sub(r'[^A-Za-z0-9_.-]+', '_', netloc)
+        return os.path.join(self._cache_dir, f"frost_{name}.sqlite")
+
+    @contextmanager
+    def _connect(self, url: str):
+        """Opens (and initializes) the database of an url"""
+        os.makedirs(self._cache_dir, exist_ok=True)
+        conn = sqlite3.connect(self._databasePath(url), timeout=30)
+        try:
+            self._initialize(conn)
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _initialize(self, conn):
+        """Creates the cache tables (dropping the ones without load ids)"""
+        columns = [rec[1] for rec in conn.execute("PRAGMA table_info(pages)")]
+        if columns and 'load_id' not in columns:
+            conn.execute("DROP TABLE pages")
+            conn.execute("DROP TABLE IF EXISTS datasets")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS datasets ("
+            "url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, "
+            "row_count INTEGER, max_id TEXT, saved_at REAL, complete INTEGER, load_id TEXT)")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS pages ("
+            "url TEXT, page INTEGER, data BLOB, load_id TEXT, PRIMARY KEY (url, page))")
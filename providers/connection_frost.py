@@ -27,6 +27,7 @@ Members
 -------
 """
 import json
+import time
 import traceback
 import urllib.parse
 
@@ -49,6 +50,7 @@ from qgis.PyQt.QtCore import Qt, QObject, QEventLoop, QUrl, QUrlQuery
 from qgis.PyQt.QtWidgets import QMessageBox
 
 from SensorThingsAPI.providers.provider_frost import __FROST_PROVIDER_NAME__, FrostProvider
+from SensorThingsAPI.providers.prefetch_frost import FrostPrefetchedRows
 
 # 
 #-----------------------------------------------------------
@@ -68,11 +70,13 @@ class FrostConnection(QObject):
         self._url = str(url or '').strip()
         self._url_ext = ''
         self._loc_data = []
+        self._loc_time = None
         self._connected = False
         self._map_extent = False
         # grouping
         self._group_properties = {}
         self._group_rows = []
+        self._offered_urls = []
         # geometry types
         self._geom_types = {}
     
@@ -106,6 +110,7 @@ class FrostConnection(QObject):
         self._connected = False
         self._loc_data = []
         self._geom_types = {}
+        self._discardOffered()
         
     def modify(self, name: str=None, url: str=None):
         """Modify data"""
@@ -128,6 +133,7 @@ class FrostConnection(QObject):
             self._map_extent = map_extent
             self._loc_data = []
             self._group_properties = {}
+            self._discardOffered()
             
             # format url
             if not self._url:
@@ -151,6 +157,7 @@ class FrostConnection(QObject):
             
             # get data
             self._loc_data = FrostProvider.requestData(self._url_ext, callback=callback)        
+            self._loc_time = time.time()
             self._connected = True
             
             # get geometry types
@@ -171,9 +178,11 @@ class FrostConnection(QObject):
         """Creates an unique group with all locations"""
         # init
         self._group_rows = []
+        self._discardOffered()
         
         if self._loc_data:
             prop_text = prop_text or ''
+            self._offerRows(self._url_ext, self._loc_data)
             
             self._group_rows = [{
                 'name': self.tr('Locations'),
@@ -189,6 +198,7 @@ class FrostConnection(QObject):
         """Groups loacation by properties attributes"""
         # init
         self._group_rows = []
+        self._discardOffered()
         if not self._loc_data:
             return []
         
@@ -277,6 +287,9 @@ class FrostConnection(QObject):
         grp_url.setQuery(query)
         grp_url = grp_url.toString()
         
+        # hand off the group locations to the layers of the group url
+        self._offerRows(grp_url, [self._loc_data[i] for i in group_items])
+        
         """
         url_param = "$filter={}".format(' and '.join(prop_filters))
         url_obj = urllib.parse.urlparse(self._url_ext)
@@ -291,6 +304,16 @@ class FrostConnection(QObject):
             'url':grp_url
         }
         
+    def _offerRows(self, url, rows):
+        """Makes downloaded locations available to the providers of an url"""
+        FrostPrefetchedRows.offer(url, rows, self._loc_time)
+        self._offered_urls.append(url)
+        
+    def _discardOffered(self):
+        """Withdraws the locations offered to providers"""
+        FrostPrefetchedRows.discard(self._offered_urls)
+        self._offered_urls = []
+        
     def _quoteString(self, value):
         """Quote a string with single quotation"""
         return f"'{value}'" if isinstance(value, str) else value
@@ -0,0 +1,313 @@
+# -*- coding: utf-8 -*-
+"""SensorThings API Plugin
+
+Description
+-----------
+
+Utility class to translate QGIS expressions into SensorThings API filters.
+
+Libraries/Modules
+-----------------
+
+- None.
+
+Notes
+-----
+
+- Only a subset of QGIS expressions can be translated into an OData
+  ``$filter`` (comparisons, AND/OR/NOT, IN, LIKE, IS NULL on ``id``,
+  ``name``, ``description`` and ``properties/...`` columns); ``name`` and
+  ``description`` are compared with string literals only, ``id`` with
+  integers or quoted string ids only.
+- Top level AND terms that cannot be translated are kept as a local
+  QGIS expression, evaluated by the provider.
+- A QGIS comparison with a NULL column is NULL (never true, even negated),
+  while OData ``ne`` and ``not`` are true for null values: negated and
+  ``<>`` terms get an explicit ``<path> ne null`` condition.
+
+
+Author(s)
+---------
+
+- Created by the SensorThingsAPI plugin contributors on 18/10/2026,
+  as part of the Frost provider performance work.
+
+Members
+-------
+"""
+from qgis.core import (QgsExpression,
+                       QgsExpressionNode,
+                       QgsExpressionNodeBinaryOperator,
+                       QgsExpressionNodeUnaryOperator)
+from qgis.PyQt.QtCore import QVariant
+
+
+#: Constant for prefix of SensorThings properties columns
+__FROST_PROPERTIES_PREFIX__ = 'properties/'
+
+#
+#-----------------------------------------------------------
+class FrostFilterTranslator:
+    """Utility class to translate a QGIS expression into a SensorThings $filter"""
+
+    #: Provider fields translatable as SensorThings entity properties
+    FIELD_PATHS = {
+        'id': 'id',
+        'name': 'name',
+        'description': 'description'
+    }
+
+    #: Comparison operators
+    COMPARISON_OPERATORS = {
+        QgsExpressionNodeBinaryOperator.boEQ: 'eq',
+        QgsExpressionNodeBinaryOperator.boNE: 'ne',
+        QgsExpressionNodeBinaryOperator.boGT: 'gt',
+        QgsExpressionNodeBinaryOperator.boGE: 'ge',
+        QgsExpressionNodeBinaryOperator.boLT: 'lt',
+        QgsExpressionNodeBinaryOperator.boLE: 'le'
+    }
+
+    #: Negated comparison operators
+    NEGATED_OPERATORS = {
+        'eq': 'ne',
+        'ne': 'eq',
+        'gt': 'le',
+        'ge': 'lt',
+        'lt': 'ge',
+        'le': 'gt'
+    }
+
+    #: Comparison operators with swapped operands
+    SWAPPED_OPERATORS = {
+        'eq': 'eq',
+        'ne': 'ne',
+        'gt': 'lt',
+        'ge': 'le',
+        'lt': 'gt',
+        'le': 'ge'
+    }
+
+    @staticmethod
+    def translate(subset_string: str):
+        """Splits a subset string into a SensorThings $filter (pushdown)
+           and a local QGIS expression string for the untranslatable part"""
+        subset_string = str(subset_string or '').strip()
+        if not subset_string:
+            return '', ''
+
+        expression = QgsExpression(subset_string)
+        if expression.hasParserError() or expression.rootNode() is None:
+            return '', subset_string
+
+        # split top level AND terms
+        pushed = []
+        local = []
+        for node in FrostFilterTranslator._splitAnd(expression.rootNode()):
+            odata = FrostFilterTranslator.translateNode(node)
+            if odata is None:
+                local.append(node.dump())
+            else:
+                pushed.append(odata)
+
+        if not local:
+            local_string = ''
+        elif not pushed:
+            local_string = subset_string
+        else:
+            local_string = ' AND '.join(f"({term})" for term in local)
+
+        if len(pushed) > 1:
+            pushed = [f"({odata})" for odata in pushed]
+        return ' and '.join(pushed), local_string
+
+    @staticmethod
+    def translateNode(node, negate: bool=False):
+        """Translates an expression node into a SensorThings filter matching
+           the features for which the node is true (false if negate is set),
+           returns None if not translatable"""
+        node_type = node.nodeType()
+
+        if node_type == QgsExpressionNode.ntBinaryOperator:
+            return FrostFilterTranslator._translateBinary(node, negate)
+
+        if node_type == QgsExpressionNode.ntUnaryOperator:
+            if node.op() != QgsExpressionNodeUnaryOperator.uoNot:
+                return None
+            return FrostFilterTranslator.translateNode(node.operand(), not negate)
+
+        if node_type == QgsExpressionNode.ntInOperator:
+            path = FrostFilterTranslator._columnPath(node.node())
+            if path is None:
+                return None
+            terms = []
+            for item in node.list().list():
+                value = FrostFilterTranslator._literal(item, path)
+                if value is None or value == 'null':
+                    return None
+                terms.append(f"{path} eq {value}")
+            if not terms:
+                return None
+            odata = "({})".format(' or '.join(terms))
+            if node.isNotIn() != negate:
+                return FrostFilterTranslator._notNull(f"not {odata}", path)
+            return odata
+
+        return None
+
+    @staticmethod
+    def quoteValue(value):
+        """Returns a SensorThings literal for a python value"""
+        if FrostFilterTranslator.isNull(value):
+            return 'null'
+        if isinstance(value, bool):
+            return 'true' if value else 'false'
+        if isinstance(value, (int, float)):
+            return repr(value)
+        value = str(value).replace("'", "''")
+        return f"'{value}'"
+
+    @staticmethod
+    def isNull(value):
+        """Returns true if a value is NULL"""
+        return value is None or (isinstance(value, QVariant) and value.isNull())
+
+    @staticmethod
+    def _splitAnd(node):
+        """Returns the list of top level AND terms"""
+        if node.nodeType() == QgsExpressionNode.ntBinaryOperator and\
+           node.op() == QgsExpressionNodeBinaryOperator.boAnd:
+            return FrostFilterTranslator._splitAnd(node.opLeft()) +\
+                   FrostFilterTranslator._splitAnd(node.opRight())
+        return [node]
+
+    @staticmethod
+    def _notNull(odata, path):
+        """Adds the not null condition of a column path to a negated filter"""
+        if path == 'id':
+            return odata
+        return f"{odata} and {path} ne null"
+
+    @staticmethod
+    def _translateBinary(node, negate=False):
+        """Translates a binary operator node"""
+        op = node.op()
+
+        # boolean operators (negated by De Morgan's laws)
+        if op in (QgsExpressionNodeBinaryOperator.boAnd, QgsExpressionNodeBinaryOperator.boOr):
+            left = FrostFilterTranslator.translateNode(node.opLeft(), negate)
+            right = FrostFilterTranslator.translateNode(node.opRight(), negate)
+            if left is None or right is None:
+                return None
+            bool_op = 'and' if (op == QgsExpressionNodeBinaryOperator.boAnd) != negate else 'or'
+            return f"({left}) {bool_op} ({right})"
+
+        # comparison operators
+        if op in FrostFilterTranslator.COMPARISON_OPERATORS:
+            odata_op = FrostFilterTranslator.COMPARISON_OPERATORS[op]
+            path = FrostFilterTranslator._columnPath(node.opLeft())
+            value_node = node.opRight()
+            if path is None:
+                path = FrostFilterTranslator._columnPath(node.opRight())
+                value_node = node.opLeft()
+                odata_op = FrostFilterTranslator.SWAPPED_OPERATORS[odata_op]
+            if path is None:
+                return None
+            value = FrostFilterTranslator._literal(value_node, path)
+            if value is None or value == 'null':
+                return None
+            if negate:
+                odata_op = FrostFilterTranslator.NEGATED_OPERATORS[odata_op]
+            odata = f"{path} {odata_op} {value}"
+            return FrostFilterTranslator._notNull(odata, path) if odata_op == 'ne' else odata
+
+        # IS NULL / IS NOT NULL
+        if op in (QgsExpressionNodeBinaryOperator.boIs, QgsExpressionNodeBinaryOperator.boIsNot):
+            path = FrostFilterTranslator._columnPath(node.opLeft())
+            right = node.opRight()
+            if path is None or right.nodeType() != QgsExpressionNode.ntLiteral or\
+               not FrostFilterTranslator.isNull(right.value()):
+                return None
+            odata_op = 'eq' if (op == QgsExpressionNodeBinaryOperator.boIs) != negate else 'ne'
+            return f"{path} {odata_op} null"
+
+        # LIKE
+        like_ops = {
+            QgsExpressionNodeBinaryOperator.boLike: (False, False),
+            QgsExpressionNodeBinaryOperator.boNotLike: (False, True),
+            QgsExpressionNodeBinaryOperator.boILike: (True, False),
+            QgsExpressionNodeBinaryOperator.boNotILike: (True, True)
+        }
+        if op in like_ops:
+            ignore_case, like_negate = like_ops[op]
+            odata = FrostFilterTranslator._translateLike(node.opLeft(), node.opRight(), ignore_case)
+            if odata is None:
+                return None
+            if negate != like_negate:
+                return FrostFilterTranslator._notNull(f"not ({odata})", FrostFilterTranslator._columnPath(node.opLeft()))
+            return odata
+
+        return None
+
+    @staticmethod
+    def _translateLike(column_node, pattern_node, ignore_case):
+        """Translates a LIKE operator with leading/trailing wildcards only"""
+        path = FrostFilterTranslator._columnPath(column_node)
+        if path is None or path == 'id':
+            return None
+        if pattern_node.nodeType() != QgsExpressionNode.ntLiteral:
+            return None
+        pattern = pattern_node.value()
+        if not isinstance(pattern, str) or '_' in pattern or '\\' in pattern:
+            return None
+
+        starts = pattern.startswith('%')
+        ends = pattern.endswith('%') and len(pattern) > 1
+        text = pattern[1 if starts else 0:len(pattern) - 1 if ends else len(pattern)]
+        if not text or '%' in text:
+            return None
+
+        if ignore_case:
+            path = f"tolower({path})"
+            text = text.lower()
+        value = FrostFilterTranslator.quoteValue(text)
+
+        if starts and ends:
+            return f"substringof({value}, {path})"
+        if starts:
+            return f"endswith({path}, {value})"
+        if ends:
+            return f"startswith({path}, {value})"
+        return f"{path} eq {value}"
+
+    @staticmethod
+    def _columnPath(node):
+        """Returns the SensorThings path of a column reference node"""
+        if node.nodeType() != QgsExpressionNode.ntColumnRef:
+            return None
+        name = str(node.name())
+        if name in FrostFilterTranslator.FIELD_PATHS:
+            return FrostFilterTranslator.FIELD_PATHS[name]
+        if name.startswith(__FROST_PROPERTIES_PREFIX__) and len(name) > len(__FROST_PROPERTIES_PREFIX__):
+            return name
+        return None
+
+    @staticmethod
+    def _literal(node, path):
+        """Returns the SensorThings literal of a literal node"""
+        if node.nodeType() != QgsExpressionNode.ntLiteral:
+            return None
+        value = node.value()
+        if path == 'id':
+            # only unambiguous ids: integers, or strings quoted as the 
+            # provider stores string ids
+            if isinstance(value, str):
+                if len(value) < 2 or not value.startswith("'") or not value.endswith("'"):
+                    return None
+                value = value[1:-1]
+            elif isinstance(value, bool) or not isinstance(value, int):
+                return None
+        elif path in FrostFilterTranslator.FIELD_PATHS:
+            # string fields: other types follow QGIS conversion rules
+            if not isinstance(value, str):
+                return None
+        return FrostFilterTranslator.quoteValue(value)
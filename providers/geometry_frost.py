@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+"""SensorThings API Plugin
+
+Description
+-----------
+
+Fast decoder of GeoJSON locations into WKB geometries for the Frost Provider.
+
+Libraries/Modules
+-----------------
+
+- None.
+
+Notes
+-----
+
+- Builds WKB blobs and bounding boxes directly from already decoded
+  GeoJSON dictionaries (Point, MultiPoint, LineString, MultiLineString,
+  Polygon, MultiPolygon and the Feature wrapper).
+- Returns None for anything else (collections, mixed dimensions, empty or
+  invalid coordinates): the caller falls back to QgsJsonUtils.
+
+
+Author(s)
+---------
+
+- Created by the SensorThingsAPI plugin contributors on 18/10/2026,
+  as part of the Frost provider performance work.
+
+Members
+-------
+"""
+import struct
+from itertools import chain
+
+
+#: Constant for WKB geometry type codes (ISO, 2D)
+__FROST_WKB_TYPES__ = {
+    'point': 1,
+    'linestring': 2,
+    'polygon': 3,
+    'multipoint': 4,
+    'multilinestring': 5,
+    'multipolygon': 6
+}
+
+#: Constant for WKB offset of 3D geometry type codes (ISO)
+__FROST_WKB_Z_OFFSET__ = 1000
+
+#
+#-----------------------------------------------------------
+class FrostGeometryDecoder:
+    """Decodes GeoJSON geometries into WKB blobs"""
+
+    _header = struct.Struct('<BI')
+    _count = struct.Struct('<I')
+
+    @staticmethod
+    def decode(location):
+        """Returns (wkb type, wkb, (xmin, ymin, xmax, ymax)) of a GeoJSON
+           location, None if not supported by the fast path"""
+        try:
+            if not isinstance(location, dict):
+                return None
+            if str(location.get('type') or '').lower() == 'feature':
+                location = location.get('geometry')
+                if not isinstance(location, dict):
+                    return None
+
+            geom_type = str(location.get('type') or '').lower()
+            base_type = __FROST_WKB_TYPES__.get(geom_type)
+            coordinates = location.get('coordinates')
+            if base_type is None or not coordinates:
+                return None
+
+            # collect point sequences to get dimension and bounding box
+            if base_type == 1:
+                points = [coordinates]
+            elif base_type in (2, 4):
+                points = coordinates
+            elif base_type in (3, 5):
+                points = list(chain.from_iterable(coordinates))
+            else:
+                points = list(chain.from_iterable(chain.from_iterable(coordinates)))
+            if not points:
+                return None
+
+            dim = len(points[0])
+            if dim not in (2, 3) or any(len(p) != dim for p in points):
+                return None
+            xs = [float(p[0]) for p in points]
+            ys = [float(p[1]) for p in points]
+            bbox = (min(xs), min(ys), max(xs), max(ys))
+
+            wkb_type = base_type + (__FROST_WKB_Z_OFFSET__ if dim == 3 else 0)
+            point_type = 1 + (__FROST_WKB_Z_OFFSET__ if dim == 3 else 0)
+            line_type = 2 + (__FROST_WKB_Z_OFFSET__ if dim == 3 else 0)
+            polygon_type = 3 + (__FROST_WKB_Z_OFFSET__ if dim == 3 else 0)
+
+            dec = FrostGeometryDecoder
+            if base_type == 1:
+                wkb = dec._header.pack(1, wkb_type) + dec._packPoints([coordinates], dim)
+            elif base_type == 2:
+                wkb = dec._header.pack(1, wkb_type) + dec._packLine(coordinates, dim)
+            elif base_type == 3:
+                wkb = dec._header.pack(1, wkb_type) + dec._packPolygon(coordinates, dim)
+            elif base_type == 4:
+                wkb = dec._header.pack(1, wkb_type) + dec._count.pack(len(coordinates)) + b''.join(
+                    dec._header.pack(1, point_type) + dec._packPoints([p], dim) for p in coordinates)
+            elif base_type == 5:
+                wkb = dec._header.pack(1, wkb_type) + dec._count.pack(len(coordinates)) + b''.join(
+                    dec._header.pack(1, line_type) + dec._packLine(line, dim) for line in coordinates)
+            else:
+                wkb = dec._header.pack(1, wkb_type) + dec._count.pack(len(coordinates)) + b''.join(
+                    dec._header.pack(1, polygon_type) + dec._packPolygon(polygon, dim) for polygon in coordinates)
+
+            return wkb_type, wkb, bbox
+
+        except (TypeError, ValueError, IndexError, AttributeError, struct.error):
+            return None
+
+    @staticmethod
+    def _packPoints(points, dim):
+        """Packs a sequence of points as doubles (batched)"""
+        return struct.pack('<%dd' % (len(points) * dim), *chain.from_iterable(points))
+
+    @staticmethod
+    def _packLine(points, dim):
+        """Packs a line string body"""
+        return FrostGeometryDecoder._count.pack(len(points)) + FrostGeometryDecoder._packPoints(points, dim)
+
+    @staticmethod
+    def _packPolygon(rings, dim):
+        """Packs a polygon body"""
+        return FrostGeometryDecoder._count.pack(len(rings)) + b''.join(
+            FrostGeometryDecoder._packLine(ring, dim) for ring in rings)
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+"""SensorThings API Plugin
+
+Description
+-----------
+
+Adaptive page size ($top) of Frost server data windows.
+
+Libraries/Modules
+-----------------
+
+- None.
+
+Notes
+-----
+
+- The effective maximum page size (server maxTop) is discovered from
+  the first page of a load, requested with an unbounded $top.
+- The $top of the following $skip windows is tuned toward a target page
+  latency and persisted per service root in QgsSettings.
+- $top limits the whole result in OData, so only explicit $skip/$top
+  windows can be tuned; pages following next links keep the server size.
+
+
+Author(s)
+---------
+
+- Created by the SensorThingsAPI plugin contributors on 18/10/2026,
+  as part of the Frost provider performance work.
+
+Members
+-------
+"""
+import re
+
+from qgis.core import QgsSettings
+from qgis.PyQt.QtCore import QUrl
+
+
+#: Constant for paging settings key prefix
+__FROST_PAGER_SETTINGS__ = 'frost/paging'
+
+#: Constant for default target latency of a data page (ms)
+__FROST_PAGER_DEFAULT_LATENCY__ = 2000
+
+#: Constant for minimum page size
+__FROST_PAGER_MIN_TOP__ = 100
+
+#
+#-----------------------------------------------------------
+class FrostPageSizer:
+    """Adaptive page size of a Frost server"""
+
+    def __init__(self, url: str, first_page_size: int, truncated: bool):
+        """Constructor: first_page_size is the size of the first page,
+           truncated if the server capped it (next link available)"""
+        self._key = FrostPageSizer.serviceKey(url)
+        s = QgsSettings()
+        try:
+            self._max_top = int(s.value(self._settingsKey('maxTop'), 0))
+            self._top = int(s.value(self._settingsKey('top'), 0))
+        except (TypeError, ValueError):
+            self._max_top = self._top = 0
+
+        # discover the server maximum page size
+        if truncated and first_page_size > 0:
+            self._max_top = first_page_size
+        if self._top <= 0:
+            self._top = self._max_top or max(first_page_size, __FROST_PAGER_MIN_TOP__)
+        self._top = self._clamp(self._top)
+        self._row_time = None
+
+    @staticmethod
+    def serviceKey(url: str) -> str:
+        """Returns the settings key of the service root of an url"""
+        url = QUrl(url)
+        segments = [seg for seg in url.path().split('/') if seg]
+        root = []
+        for seg in segments:
+            root.append(seg)
+            if re.match(r'^v\d+(\.\d+)?$', seg):
+                break
+        else:
+            root = segments[:-1]
+        name = '{}/{}'.format(url.host(), '/'.join(root))
+        return re.sub(r'[^A-Za-z0-9_.-]+', '_', name)
+
+    @staticmethod
+    def targetLatency() -> float:
+        """Returns the target latency of a data page (seconds)"""
+        try:
+            value = int(QgsSettings().value(
+                f"{__FROST_PAGER_SETTINGS__}/targetLatency", __FROST_PAGER_DEFAULT_LATENCY__))
+        except (TypeError, ValueError):
+            value = __FROST_PAGER_DEFAULT_LATENCY__
+        return max(value, 1) / 1000.0
+
+    @property
+    def top(self) -> int:
+        """Returns the current page size"""
+        return self._top
+
+    @property
+    def maxTop(self) -> int:
+        """Returns the server maximum page size (0 if unknown)"""
+        return self._max_top
+
+    def observe(self, top: int, count: int, elapsed: float, truncated: bool=False):
+        """Tunes the page size with a received page"""
+        if truncated and count > 0:
+            # page capped by the server
+            self._max_top = count if not self._max_top else min(self._max_top, count)
+        if count <= 0 or elapsed <= 0.0:
+            self._top = self._clamp(self._top)
+            return
+
+        # moving average of the time per row
+        row_time = elapsed / count
+        self._row_time = row_time if self._row_time is None else 0.7 * self._row_time + 0.3 * row_time
+
+        # move halfway toward the size matching the target latency
+        desired = self.targetLatency() / self._row_time
+        self._top = self._clamp(int((self._top + desired) / 2))
+
+    def save(self):
+        """Persists the learned page sizes"""
+        s = QgsSettings()
+        s.setValue(self._settingsKey('top'), self._top)
+        if self._max_top:
+            s.setValue(self._settingsKey('maxTop'), self._max_top)
+
+    def _clamp(self, top: int) -> int:
+        """Limits a page size to the allowed range"""
+        top = max(int(top), __FROST_PAGER_MIN_TOP__)
+        if self._max_top:
+            top = min(top, self._max_top)
+        return top
+
+    def _settingsKey(self, name: str) -> str:
+        """Returns a settings key of the service root"""
+        return f"{__FROST_PAGER_SETTINGS__}/servers/{self._key}/{name}"
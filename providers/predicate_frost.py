@@ -0,0 +1,335 @@
+# -*- coding: utf-8 -*-
+"""SensorThings API Plugin
+
+Description
+-----------
+
+Compiler of QGIS expressions into predicates over the Frost feature store columns.
+
+Libraries/Modules
+-----------------
+
+- None.
+
+Notes
+-----
+
+- Compiles comparisons, IN lists, LIKE/ILIKE, IS NULL and AND/OR/NOT
+  combinations of provider fields and literals; anything else (functions,
+  variables, geometry, mixed value types) is left to QgsExpression.
+- A predicate evaluates whole columns at once into a selection bitmap
+  (one byte per row, 1 if selected) with the QGIS NULL semantics.
+- Partial results are kept as (true, false) masks packed in python integers
+  (one byte per row), so boolean operators are single integer operations.
+- Equality and IN tests use an attribute index of the column when available.
+
+
+Author(s)
+---------
+
+- Created by the SensorThingsAPI plugin contributors on 18/10/2026,
+  as part of the Frost provider performance work.
+
+Members
+-------
+"""
+import re
+import operator
+
+from qgis.core import (QgsExpression,
+                       QgsExpressionNode,
+                       QgsExpressionNodeBinaryOperator,
+                       QgsExpressionNodeUnaryOperator)
+from qgis.PyQt.QtCore import QVariant
+
+
+#
+#-----------------------------------------------------------
+class FrostPredicateNotSupported(Exception):
+    """Expression not compilable into a predicate"""
+
+#
+#-----------------------------------------------------------
+class FrostColumnView:
+    """Published rows of the store columns, read on demand"""
+
+    def __init__(self, store, index_of=None, rows=None):
+        """Constructor: index_of returns the attribute index of a field
+           (or None) for the current store version; rows restricts the
+           view to a list of candidate rows"""
+        self.count = len(store) if rows is None else len(rows)
+        self._store = store
+        self._index_of = index_of
+        self._rows = rows
+        self._columns = {}
+
+    def column(self, field_index: int) -> list:
+        """Returns the published values of a column (of the candidate rows)"""
+        column = self._columns.get(field_index)
+        if column is None:
+            column = self._store.columns[field_index]
+            if self._rows is None:
+                column = column[:self.count]
+            else:
+                column = [column[row] for row in self._rows]
+            self._columns[field_index] = column
+        return column
+
+    def index(self, field_index: int):
+        """Returns the attribute index of a column, None if not available"""
+        if self._index_of is None or self._rows is not None:
+            return None
+        index = self._index_of(field_index)
+        if index is None or index.size != self.count:
+            return None
+        return index
+
+#
+#-----------------------------------------------------------
+class FrostPredicate:
+    """Compiled predicate over the columns of a feature store"""
+
+    def __init__(self, expression: str, function):
+        """Constructor"""
+        self._expression = expression
+        self._function = function
+
+    @property
+    def expression(self) -> str:
+        """Returns the compiled expression string"""
+        return self._expression
+
+    def select(self, store, index_of=None, rows=None) -> bytes:
+        """Returns the selection bitmap of the store rows (of the candidate
+           rows if given), None if the stored values cannot be compared"""
+        view = FrostColumnView(store, index_of, rows)
+        try:
+            true_mask, _ = self._function(view)
+        except FrostPredicateNotSupported:
+            return None
+        return true_mask.to_bytes(view.count, 'little')
+
+#
+#-----------------------------------------------------------
+class FrostPredicateCompiler:
+    """Utility class to compile a QGIS expression into a store predicate"""
+
+    #: Comparison operators
+    COMPARISON_OPERATORS = {
+        QgsExpressionNodeBinaryOperator.boEQ: operator.eq,
+        QgsExpressionNodeBinaryOperator.boNE: operator.ne,
+        QgsExpressionNodeBinaryOperator.boGT: operator.gt,
+        QgsExpressionNodeBinaryOperator.boGE: operator.ge,
+        QgsExpressionNodeBinaryOperator.boLT: operator.lt,
+        QgsExpressionNodeBinaryOperator.boLE: operator.le
+    }
+
+    #: Comparison operators with swapped operands
+    SWAPPED_OPERATORS = {
+        operator.eq: operator.eq,
+        operator.ne: operator.ne,
+        operator.gt: operator.lt,
+        operator.ge: operator.le,
+        operator.lt: operator.gt,
+        operator.le: operator.ge
+    }
+
+    #: LIKE operators: (ignore case, negate)
+    LIKE_OPERATORS = {
+        QgsExpressionNodeBinaryOperator.boLike: (False, False),
+        QgsExpressionNodeBinaryOperator.boNotLike: (False, True),
+        QgsExpressionNodeBinaryOperator.boILike: (True, False),
+        QgsExpressionNodeBinaryOperator.boNotILike: (True, True)
+    }
+
+    @staticmethod
+    def compile(expression, fields):
+        """Returns the predicate of an expression (string or QgsExpression)
+           over the provider fields, None if not compilable"""
+        if expression is None:
+            return None
+        if not isinstance(expression, QgsExpression):
+            expression = QgsExpression(str(expression))
+        if expression.hasParserError() or expression.rootNode() is None:
+            return None
+
+        try:
+            function = FrostPredicateCompiler._compileNode(expression.rootNode(), fields)
+        except FrostPredicateNotSupported:
+            return None
+        return FrostPredicate(expression.expression(), function)
+
+    @staticmethod
+    def ones(count: int) -> int:
+        """Returns the mask with all rows set"""
+        return int.from_bytes(b'\x01' * count, 'little')
+
+    @staticmethod
+    def rowsMask(rows) -> int:
+        """Returns the mask with a list of rows set"""
+        if not rows:
+            return 0
+        bitmap = bytearray(rows[-1] + 1)
+        for row in rows:
+            bitmap[row] = 1
+        return int.from_bytes(bitmap, 'little')
+
+    @staticmethod
+    def isNull(value):
+        """Returns true if a value is NULL"""
+        return value is None or (isinstance(value, QVariant) and value.isNull())
+
+    @staticmethod
+    def _compileNode(node, fields):
+        """Returns the function of a boolean node: column view => (true mask, false mask)"""
+        node_type = node.nodeType()
+
+        if node_type == QgsExpressionNode.ntBinaryOperator:
+            return FrostPredicateCompiler._compileBinary(node, fields)
+
+        if node_type == QgsExpressionNode.ntUnaryOperator:
+            if node.op() != QgsExpressionNodeUnaryOperator.uoNot:
+                raise FrostPredicateNotSupported()
+            operand = FrostPredicateCompiler._compileNode(node.operand(), fields)
+            return lambda view: operand(view)[::-1]
+
+        if node_type == QgsExpressionNode.ntInOperator:
+            index = FrostPredicateCompiler._fieldIndex(node.node(), fields)
+            values = [FrostPredicateCompiler._literal(item) for item in node.list().list()]
+            if not values or any(FrostPredicateCompiler.isNull(value) for value in values):
+                raise FrostPredicateNotSupported()
+            kind = FrostPredicateCompiler._kind(values[0])
+            if any(FrostPredicateCompiler._kind(value) != kind for value in values):
+                raise FrostPredicateNotSupported()
+            function = FrostPredicateCompiler._leaf(index, kind, frozenset(values).__contains__, values)
+            if node.isNotIn():
+                return lambda view: function(view)[::-1]
+            return function
+
+        raise FrostPredicateNotSupported()
+
+    @staticmethod
+    def _compileBinary(node, fields):
+        """Returns the function of a binary operator node"""
+        op = node.op()
+
+        # boolean operators
+        if op in (QgsExpressionNodeBinaryOperator.boAnd, QgsExpressionNodeBinaryOperator.boOr):
+            left = FrostPredicateCompiler._compileNode(node.opLeft(), fields)
+            right = FrostPredicateCompiler._compileNode(node.opRight(), fields)
+            if op == QgsExpressionNodeBinaryOperator.boAnd:
+                def and_function(view):
+                    left_true, left_false = left(view)
+                    right_true, right_false = right(view)
+                    return left_true & right_true, left_false | right_false
+                return and_function
+            def or_function(view):
+                left_true, left_false = left(view)
+                right_true, right_false = right(view)
+                return left_true | right_true, left_false & right_false
+            return or_function
+
+        # comparison operators
+        if op in FrostPredicateCompiler.COMPARISON_OPERATORS:
+            compare = FrostPredicateCompiler.COMPARISON_OPERATORS[op]
+            column_node, value_node = node.opLeft(), node.opRight()
+            if column_node.nodeType() != QgsExpressionNode.ntColumnRef:
+                column_node, value_node = value_node, column_node
+                compare = FrostPredicateCompiler.SWAPPED_OPERATORS[compare]
+            index = FrostPredicateCompiler._fieldIndex(column_node, fields)
+            value = FrostPredicateCompiler._literal(value_node)
+            if FrostPredicateCompiler.isNull(value):
+                # comparison with NULL is always NULL
+                return lambda view: (0, 0)
+            return FrostPredicateCompiler._leaf(
+                index, FrostPredicateCompiler._kind(value), lambda v: compare(v, value),
+                [value] if compare is operator.eq else None)
+
+        # IS NULL / IS NOT NULL
+        if op in (QgsExpressionNodeBinaryOperator.boIs, QgsExpressionNodeBinaryOperator.boIsNot):
+            index = FrostPredicateCompiler._fieldIndex(node.opLeft(), fields)
+            if not FrostPredicateCompiler.isNull(FrostPredicateCompiler._literal(node.opRight())):
+                raise FrostPredicateNotSupported()
+            def null_function(view):
+                attribute_index = view.index(index)
+                if attribute_index is not None:
+                    null_mask = FrostPredicateCompiler.rowsMask(attribute_index.rowsOf(None))
+                else:
+                    null_mask = int.from_bytes(bytes([v is None for v in view.column(index)]), 'little')
+                return null_mask, FrostPredicateCompiler.ones(view.count) ^ null_mask
+            if op == QgsExpressionNodeBinaryOperator.boIsNot:
+                return lambda view: null_function(view)[::-1]
+            return null_function
+
+        # LIKE
+        if op in FrostPredicateCompiler.LIKE_OPERATORS:
+            ignore_case, negate = FrostPredicateCompiler.LIKE_OPERATORS[op]
+            index = FrostPredicateCompiler._fieldIndex(node.opLeft(), fields)
+            pattern = FrostPredicateCompiler._literal(node.opRight())
+            if not isinstance(pattern, str) or '\\' in pattern:
+                raise FrostPredicateNotSupported()
+            regex = re.compile(
+                ''.join('.*' if c == '%' else '.' if c == '_' else re.escape(c) for c in pattern),
+                re.DOTALL | (re.IGNORECASE if ignore_case else 0))
+            function = FrostPredicateCompiler._leaf(index, str, lambda v: regex.fullmatch(v) is not None)
+            if negate:
+                return lambda view: function(view)[::-1]
+            return function
+
+        raise FrostPredicateNotSupported()
+
+    @staticmethod
+    def _leaf(index, kind, test, lookup_values=None):
+        """Returns the function testing the not NULL values of a column;
+           lookup_values are the values tested for equality, if any"""
+        def leaf_function(view):
+            attribute_index = view.index(index) if lookup_values is not None else None
+            if attribute_index is not None:
+                # equality lookups in the attribute index
+                if any(FrostPredicateCompiler._typeKind(t) is not kind for t in attribute_index.types()):
+                    raise FrostPredicateNotSupported()
+                rows = sorted(row for value in set(lookup_values) for row in attribute_index.rowsOf(value))
+                true_mask = FrostPredicateCompiler.rowsMask(rows)
+                null_mask = FrostPredicateCompiler.rowsMask(attribute_index.rowsOf(None))
+                return true_mask, FrostPredicateCompiler.ones(view.count) ^ null_mask ^ true_mask
+            
+            values = view.column(index)
+            # values of other types follow QGIS conversion rules: not compiled
+            if any(v is not None and FrostPredicateCompiler._kind(v) is not kind for v in values):
+                raise FrostPredicateNotSupported()
+            true_mask = int.from_bytes(bytes([v is not None and test(v) for v in values]), 'little')
+            not_null_mask = int.from_bytes(bytes([v is not None for v in values]), 'little')
+            return true_mask, not_null_mask ^ true_mask
+        return leaf_function
+
+    @staticmethod
+    def _kind(value):
+        """Returns the comparison kind of a value (str or float)"""
+        return FrostPredicateCompiler._typeKind(type(value))
+
+    @staticmethod
+    def _typeKind(value_type):
+        """Returns the comparison kind of a value type (str or float)"""
+        if issubclass(value_type, str):
+            return str
+        if issubclass(value_type, (int, float)) and not issubclass(value_type, bool):
+            return float
+        raise FrostPredicateNotSupported()
+
+    @staticmethod
+    def _fieldIndex(node, fields):
+        """Returns the field index of a column reference node"""
+        if node.nodeType() != QgsExpressionNode.ntColumnRef:
+            raise FrostPredicateNotSupported()
+        index = fields.indexFromName(str(node.name()))
+        if index < 0:
+            raise FrostPredicateNotSupported()
+        return index
+
+    @staticmethod
+    def _literal(node):
+        """Returns the value of a literal node"""
+        if node.nodeType() != QgsExpressionNode.ntLiteral:
+            raise FrostPredicateNotSupported()
+        value = node.value()
+        return None if FrostPredicateCompiler.isNull(value) else value
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""SensorThings API Plugin
+
+Description
+-----------
+
+Hand off of the Locations already downloaded by a Frost connection.
+
+Libraries/Modules
+-----------------
+
+- None.
+
+Notes
+-----
+
+- The connection offers the rows of each location group under the
+  group url; providers of that url fill their stores from these rows
+  instead of downloading them again.
+- Offered rows are used only within a freshness window (settings).
+
+
+Author(s)
+---------
+
+- Created by the SensorThingsAPI plugin contributors on 18/10/2026,
+  as part of the Frost provider performance work.
+
+Members
+-------
+"""
+import time
+import threading
+
+from qgis.core import QgsSettings
+
+from SensorThingsAPI.providers.registry_frost import FrostDatasetRegistry
+
+
+#: Constant for prefetch settings key prefix
+__FROST_PREFETCH_SETTINGS__ = 'frost/prefetch'
+
+#: Constant for default freshness window of prefetched rows (seconds)
+__FROST_PREFETCH_DEFAULT_TTL__ = 300
+
+#
+#-----------------------------------------------------------
+class FrostPrefetchedRows:
+    """Process-wide store of rows already downloaded, by url"""
+
+    _lock = threading.RLock()
+    # url key => (rows, time of download)
+    _rows = {}
+
+    @staticmethod
+    def ttl() -> int:
+        """Returns the freshness window of prefetched rows in seconds"""
+        try:
+            return int(QgsSettings().value(
+                f"{__FROST_PREFETCH_SETTINGS__}/ttl", __FROST_PREFETCH_DEFAULT_TTL__))
+        except (TypeError, ValueError):
+            return __FROST_PREFETCH_DEFAULT_TTL__
+
+    @classmethod
+    def offer(cls, url: str, rows: list, loaded_at: float=None):
+        """Makes the downloaded rows of an url available to providers"""
+        with cls._lock:
+            cls._rows[FrostDatasetRegistry.normalizeKey(url)] = (
+                rows, time.time() if loaded_at is None else loaded_at)
+
+    @classmethod
+    def rows(cls, key: str):
+        """Returns the fresh rows of an url key, None if not available"""
+        if key is None:
+            return None
+        ttl = cls.ttl()
+        now = time.time()
+        with cls._lock:
+            # drop expired rows
+            for k in [k for k, (_, loaded_at) in cls._rows.items() if now - loaded_at > ttl]:
+                del cls._rows[k]
+            rec = cls._rows.get(key)
+            return rec[0] if rec else None
+
+    @classmethod
+    def discard(cls, urls):
+        """Removes the rows of a list of urls"""
+        with cls._lock:
+            for url in urls:
+                cls._rows.pop(FrostDatasetRegistry.normalizeKey(url), None)
@@ -26,15 +26,21 @@ Author(s)
 Members
 -------
 """
+import re
 import json
+import time
+import sqlite3
 from json import JSONDecodeError
+import threading
 import traceback
+from collections import deque, OrderedDict
+from itertools import compress
 
 from qgis.core import (
     Qgis,
     QgsField,
     QgsFields,
-    #QgsPointXY,
+    QgsPointXY,
     QgsFeatureRequest,
     QgsFeature,
     QgsGeometry,
@@ -56,13 +62,27 @@ from qgis.core import (
     QgsCsException,
     QgsMessageLog,
     QgsNetworkAccessManager,
-    QgsDataSourceUri
+    QgsDataSourceUri,
+    QgsSettings,
+    QgsTask,
+    QgsFeatureSource,
+    QgsVectorLayer
 )
 
-from qgis.PyQt.QtCore import QVariant, QUrl, QUrlQuery, QEventLoop, QCoreApplication
+from qgis.PyQt.QtCore import QObject, QVariant, QUrl, QUrlQuery, QEventLoop, QCoreApplication, QThread, QTimer, pyqtSignal
 from qgis.PyQt.QtNetwork import QNetworkRequest, QNetworkReply
 from qgis.core import QgsApplication, QgsJsonUtils
 
+from SensorThingsAPI.providers.store_frost import FrostFeatureStore, FrostStoreSelection, FrostAttributeIndex
+from SensorThingsAPI.providers.filter_frost import FrostFilterTranslator
+from SensorThingsAPI.providers.tiles_frost import FrostTileCache
+from SensorThingsAPI.providers.cache_frost import FrostLocationCache
+from SensorThingsAPI.providers.geometry_frost import FrostGeometryDecoder
+from SensorThingsAPI.providers.pager_frost import FrostPageSizer
+from SensorThingsAPI.providers.registry_frost import FrostDatasetRegistry, FrostDatasetHandle
+from SensorThingsAPI.providers.prefetch_frost import FrostPrefetchedRows
+from SensorThingsAPI.providers.predicate_frost import FrostPredicateCompiler
+
 
 #: Constant for provider name  
 __FROST_PROVIDER_NAME__ = 'frost'
@@ -76,6 +96,234 @@ __FROST_DEFAULT_GEOM_TYPE__ = QgsWkbTypes.Point
 #: Constant for provider geometry type url parameter
 __FROST_PARAMETER_GEOM_TYPE__ = '__providerGeomType'
 
+#: Constant for provider tile size url parameter (lazy loading mode, degrees)
+__FROST_PARAMETER_TILE_SIZE__ = '__providerTileSize'
+
+#: Constant for default number of concurrent page requests
+__FROST_DEFAULT_CONCURRENCY__ = 4
+
+#: Constant for default number of retries of a failed page request
+__FROST_DEFAULT_RETRIES__ = 3
+
+#: Constant for default delay before the first retry of a page request (ms)
+__FROST_DEFAULT_RETRY_DELAY__ = 1000
+
+#: Constant for size of page head/tail searched for the next link
+__FROST_PEEK_SIZE__ = 4096
+
+#: Constant for regular expression of the next link in a raw page body
+__FROST_NEXT_LINK_RE__ = re.compile(rb'"@iot\.nextLink"\s*:\s*"((?:[^"\\]|\\.)*)"')
+
+#: Constant for default minimum interval between repaints of a loading layer (ms)
+__FROST_DEFAULT_REPAINT_INTERVAL__ = 500
+
+#: Constant for SensorThings properties always requested with $select
+__FROST_SELECT_LOCATION__ = 'location'
+
+#: Constant for default maximum number of cached tiles
+__FROST_DEFAULT_MAX_TILES__ = 256
+
+#: Constant for default maximum number of features in cached tiles
+__FROST_DEFAULT_MAX_TILE_FEATURES__ = 500000
+
+#: Constant for maximum number of memoized filter expression selections
+__FROST_MAX_FILTER_SELECTIONS__ = 8
+
+# 
+#-----------------------------------------------------------
+class FrostLoadStats:
+    """Instrumentation of a data load; loads of full rows (no $select)
+       record their bytes per row as the baseline of the server entity set,
+       used to estimate the bytes saved by loads with $select"""
+    
+    def __init__(self, url):
+        """Constructor"""
+        self.url = url
+        query = QUrlQuery(QUrl(url).query())
+        self.selected = query.hasQueryItem('$select')
+        self.full_rows = not self.selected and not query.hasQueryItem('$expand')
+        self.pages = 0
+        self.rows = 0
+        self.bytes = 0
+        self.wait = 0.0
+        self.busy = 0.0
+        self.overlap = 0.0
+        
+    def addPage(self, content, busy, overlapped, rows=0):
+        """Adds a consumed page; overlapped if a request was in flight meanwhile"""
+        self.pages += 1
+        self.rows += rows
+        self.bytes += len(content)
+        self.busy += busy
+        if overlapped:
+            self.overlap += busy
+    
+    @property
+    def bytesPerRow(self):
+        """Returns the average size of a received row"""
+        return self.bytes / self.rows if self.rows > 0 else 0.0
+    
+    @property
+    def overlapRatio(self):
+        """Returns the ratio of decoding time overlapped with network transfers"""
+        return self.overlap / self.busy if self.busy > 0.0 else 0.0
+    
+    def _baselineKey(self):
+        """Returns the settings key of the full row size of the url entity set"""
+        entity_set = QUrl(self.url).path().rstrip('/').split('/')[-1]
+        return "{}/paging/servers/{}/{}/fullRowBytes".format(
+            __FROST_PROVIDER_NAME__, FrostPageSizer.serviceKey(self.url), entity_set)
+    
+    def savedBytes(self):
+        """Returns the estimated bytes saved by $select (from the recorded 
+           full row size), None if not selected or no baseline recorded"""
+        if not self.selected or self.rows <= 0:
+            return None
+        try:
+            baseline = float(QgsSettings().value(self._baselineKey(), 0.0))
+        except (TypeError, ValueError):
+            return None
+        if baseline <= 0.0:
+            return None
+        return max(baseline * self.rows - self.bytes, 0.0)
+        
+    def log(self):
+        """Logs load statistics (recording the full row size baseline)"""
+        if self.full_rows and self.rows > 0:
+            QgsSettings().setValue(self._baselineKey(), self.bytesPerRow)
+        saved = self.savedBytes()
+        saved_text = ", $select saved ~{:.0f} bytes ({:.0%})".format(
+            saved, saved / (saved + self.bytes)) if saved else ''
+        QgsMessageLog.logMessage(
+            "{}: {} pages, {} rows, {} bytes ({:.0f} bytes/row{}), wait {:.0f} ms, decode {:.0f} ms, overlap {:.0%} ({})".format(
+                QCoreApplication.translate(__FROST_PROVIDER_NAME__, "Data loaded"),
+                self.pages, self.rows, self.bytes, self.bytesPerRow, saved_text,
+                self.wait * 1000.0, self.busy * 1000.0, self.overlapRatio, self.url),
+            __FROST_PROVIDER_NAME__, 
+            Qgis.Info)
+
+# 
+#-----------------------------------------------------------
+class FrostSkipNotSupported(Exception):
+    """Frost server does not support $skip paging"""
+
+# 
+#-----------------------------------------------------------
+class FrostRowConverter:
+    """Converts Frost data rows into feature store rows"""
+    
+    def __init__(self, wkb_type, def_wkb_type: bool):
+        """Constructor"""
+        self._wkbType = wkb_type
+        self._defWkbType = def_wkb_type
+        self.next_feature_id = 1
+    
+    @staticmethod
+    def tr(message):
+        """Returns a translated message"""
+        return QCoreApplication.translate('FrostProvider', message)
+    
+    def appendRows(self, store, rows, decoded=None):
+        """Converts data rows into features of the store; decoded is the
+           optional list of the already decoded row locations"""
+        for index, row in enumerate(rows):
+            # get id
+            iot_id = row.get('@iot.id', None)
+            
+            #properties = row.get('properties', {})
+            
+            # get location geometries
+            geom_list = self._createGeometries(
+                iot_id, row, decoded[index] if decoded is not None else self.decodeLocation(row))
+            if not geom_list:
+                continue
+                
+            # read attributes
+            attrs = []
+            attrs.append(self.quoteString(iot_id))
+            attrs.append(row.get('name', None))
+            attrs.append(row.get('description', None))
+            #attrs.append(properties.get('organization', None)) REMOVED
+                
+            # store features
+            for wkb, bbox in geom_list:
+                store.appendWkb(self.next_feature_id, attrs, wkb, *bbox)
+                self.next_feature_id += 1
+
+    @staticmethod
+    def decodeLocation(row):
+        """Returns the decoded location of a row (see FrostGeometryDecoder)"""
+        return FrostGeometryDecoder.decode(row.get('location', {}))
+    
+    @staticmethod
+    def quoteString(value):
+        """Quote a string with single quotation"""
+        return f"'{value}'" if isinstance(value, str) else value
+    
+    def _createGeometries(self, iot_id, row, decoded):
+        """Returns the list of (WKB, bounding box) of the allowed row geometries"""
+        if decoded is None:
+            # exotic geometry: slow way through QgsJsonUtils
+            geom_list = []
+            for feat in self._createFeature(iot_id, row):
+                geom = feat.geometry()
+                bbox = geom.boundingBox()
+                geom_list.append((
+                    bytes(geom.asWkb()), 
+                    (bbox.xMinimum(), bbox.yMinimum(), bbox.xMaximum(), bbox.yMaximum())))
+            return geom_list
+        
+        # check if valid geometry
+        wkb_type, wkb, bbox = decoded
+        if wkb_type == self._wkbType:
+            return [(wkb, bbox)]
+            
+        if self._defWkbType:
+            # log message
+            geom_type = QgsWkbTypes.displayString(wkb_type)
+            QgsMessageLog.logMessage(
+                "{} (@iot.id: {}): {}".format(
+                    self.tr("Geometry type not allowed"), iot_id, geom_type),
+                __FROST_PROVIDER_NAME__, 
+                Qgis.Warning)
+        return []
+    
+    def _createFeature(self, iot_id, row):
+        """ """
+        try:
+            # try to create feature from json
+            json_location = row.get('location', {})
+            json_geom = json.dumps(json_location)
+            feat_list = QgsJsonUtils.stringToFeatureList(json_geom)
+            
+            # filter feature
+            res_feat_list = []
+            for feat in feat_list:
+                # check if valid geometry
+                geom = feat.geometry()
+                if geom.wkbType() == self._wkbType:
+                    res_feat_list.append(feat)
+                    
+                elif self._defWkbType:
+                    # log message
+                    geom_type = QgsWkbTypes.displayString(geom.wkbType())
+                    QgsMessageLog.logMessage(
+                        "{} (@iot.id: {}): {}".format(
+                            self.tr("Geometry type not allowed"), iot_id, geom_type),
+                        __FROST_PROVIDER_NAME__, 
+                        Qgis.Warning)
+            
+            # return list of features
+            return res_feat_list
+            
+        except Exception as ex:
+            # emit log
+            QgsMessageLog.logMessage(
+                "{} (@iot.id: {}): {}".format(self.tr("Skipped invalid location"), iot_id, str(ex)),
+                __FROST_PROVIDER_NAME__, 
+                Qgis.Warning)
+            return []
+
 # 
 #-----------------------------------------------------------
 class FrostFeatureIteratorImpl(QgsAbstractFeatureIterator):
@@ -86,9 +334,10 @@ class FrostFeatureIteratorImpl(QgsAbstractFeatureIterator):
         super().__init__(request)
         
         # init
-        self._feature_id_list = None
         self._source = source
         self._index = 0
+        self._store = None
+        self._rows = range(0)
         self._transform = QgsCoordinateTransform()
         self._request = request if request is not None else QgsFeatureRequest()
         self._filter_rect = self.filterRectToSourceCrs(self._transform)
@@ -125,14 +374,66 @@ class FrostFeatureIteratorImpl(QgsAbstractFeatureIterator):
                 self._select_distance_within_geom = None
                 self._select_distance_within_engine = None
 
-        self._feature_id_list = None
-        if self._filter_rect is not None and self._source._provider._spatialindex is not None:
-            self._feature_id_list = self._source._provider._spatialindex.intersects(self._filter_rect)
+        # tiled mode: load tiles covering the requested rectangle
+        if self._source._provider.isTiled():
+            self._source._provider.requestTiles(self._filter_rect)
+        
+        # snapshot the feature store and the ordered row sequence to iterate
+        self._store = self._source.requestProviderFeatures()
+        
+        rows = None
+        spatialindex = self._source._provider.spatialIndex()
+        if not self._filter_rect.isNull() and spatialindex is not None:
+            # only spatial index candidates
+            rows = self._fidsToRows(spatialindex.intersects(self._filter_rect))
 
         if self._request.filterType() == QgsFeatureRequest.FilterFid or self._request.filterType() == QgsFeatureRequest.FilterFids:
+            # direct lookups of requested features
             fids = [self._request.filterFid()] if self._request.filterType() == QgsFeatureRequest.FilterFid else self._request.filterFids()
-            self._feature_id_list = list(set(self._feature_id_list).intersection(set(fids))) if self._feature_id_list else fids
+            fid_rows = self._fidsToRows(fids)
+            rows = fid_rows if rows is None else rows.intersection(fid_rows)
         
+        self._rows = range(len(self._store)) if rows is None else sorted(rows)
+        
+        # compiled filters: select rows once, evaluate expressions only if not compiled
+        provider = self._source._provider
+        self._check_filter = self._request.filterType() == QgsFeatureRequest.FilterExpression
+        selection = None
+        if self._source._subset_expression is not None:
+            # memoized rows of the local subset
+            selection = provider.subsetSelection(self._store).bitmap
+        if self._check_filter and isinstance(self._rows, range):
+            # whole store: memoized rows of the filter expression
+            filter_selection = provider.filterSelection(self._request.filterExpression(), self._store)
+            if filter_selection is not None:
+                self._check_filter = False
+                bitmap = filter_selection.bitmap
+                if selection is not None:
+                    bitmap = (int.from_bytes(selection, 'little') & int.from_bytes(bitmap, 'little')).to_bytes(len(bitmap), 'little')
+                selection = bitmap
+        if selection is not None:
+            if isinstance(self._rows, range):
+                self._rows = list(compress(self._rows, selection))
+            else:
+                self._rows = [row for row in self._rows if selection[row]]
+        if self._check_filter and not isinstance(self._rows, range):
+            # spatial or feature id candidates: test only these rows
+            predicate = FrostPredicateCompiler.compile(self._request.filterExpression(), provider.fields())
+            bitmap = predicate.select(self._store, rows=self._rows) if predicate is not None else None
+            if bitmap is not None:
+                self._check_filter = False
+                self._rows = list(compress(self._rows, bitmap))
+        
+        # fast path: features built straight from the store columns, without
+        # geometry if not requested and with the requested attributes only
+        self._fields = self._source._provider.fields()
+        self._fast_path = not self._check_filter and self._select_distance_within_engine is None and\
+            not (not self._filter_rect.isNull() and self._request.flags() & QgsFeatureRequest.ExactIntersect)
+        self._fetch_geometry = not (self._request.flags() & QgsFeatureRequest.NoGeometry)
+        if self._request.flags() & QgsFeatureRequest.SubsetOfAttributes:
+            self._attributes = [i for i in self._request.subsetOfAttributes() if 0 <= i < self._fields.count()]
+        else:
+            self._attributes = None
         
     def __del__(self):
         """Destructor"""
@@ -154,16 +455,44 @@ class FrostFeatureIteratorImpl(QgsAbstractFeatureIterator):
     def rewind(self):
         """Reset the iterator to the starting position"""
         # virtual bool rewind() = 0;
-        if self._index < 0:
+        if self._store is None:
+            # closed
             return False
         self._index = 0
         return True
 
     def close(self):
-        """End of iterating: free the resources / lock"""
-        self._index = -1
+        """End of iterating: free the resources / lock (store snapshot)"""
+        self._release()
+        FrostFeatureIterator.release(self)
         return True
 
+    def nextFeatureFilterExpression(self, f):
+        """Fetch next feature matching the filter expression: already
+           checked by fetchFeature (selection bitmap or evaluation)"""
+        return self.fetchFeature(f)
+
+    def nextFeatureFilterFids(self, f):
+        """Fetch next requested feature: rows already restricted to the
+           requested feature ids"""
+        return self.fetchFeature(f)
+
+    def _release(self):
+        """Drops the references to the store snapshot and the selected rows"""
+        self._index = -1
+        self._store = None
+        self._rows = range(0)
+        self._source = None
+
+    def _fidsToRows(self, fids):
+        """Returns the set of store rows of a feature id list"""
+        rows = set()
+        for fid in fids:
+            row = self._store.rowOf(fid)
+            if row is not None:
+                rows.add(row)
+        return rows
+
     def fetchFeature(self, f):
         """Fetch next feature, return true on success"""
         if self._index < 0:
@@ -171,38 +500,33 @@ class FrostFeatureIteratorImpl(QgsAbstractFeatureIterator):
             return False
         try:
             found = False
+            store = self._store
+            rows = self._rows
             while not found:
-                _feats = self._source.requestProviderFeatures()
-                _f = _feats[list(_feats.keys())[self._index]]
+                row = rows[self._index]
                 self._index += 1
-                
-                if self._feature_id_list and _f.id() not in self._feature_id_list:
-                    continue
 
                 if not self._filter_rect.isNull():
-                    if not _f.hasGeometry():
+                    if not store.bboxIntersects(row, self._filter_rect):
                         continue
+                
+                if self._fast_path:
+                    self._fetchRow(store, row, f)
+                    return True
+                
+                # create feature only for candidate rows
+                _f = store.feature(row, self._source._provider.fields())
+                
+                if not self._filter_rect.isNull():
                     if self._request.flags() & QgsFeatureRequest.ExactIntersect:
                         # do exact check in case we're doing intersection
                         if not self._select_rect_engine.intersects(_f.geometry().constGet()):
                             continue
-                    else:
-                        if not _f.geometry().boundingBox().intersects(self._filter_rect):
-                            continue
 
-                self._source._expression_context.setFeature(_f)
-                if self._request.filterType() == QgsFeatureRequest.FilterExpression:
+                if self._check_filter:
+                    self._source._expression_context.setFeature(_f)
                     if not self._request.filterExpression().evaluate(self._source._expression_context):
                         continue
-                if self._source._subset_expression:
-                    if not self._source._subset_expression.evaluate(self._source._expression_context):
-                        continue
-                elif self._request.filterType() == QgsFeatureRequest.FilterFids:
-                    if not _f.id() in self._request.filterFids():
-                        continue
-                elif self._request.filterType() == QgsFeatureRequest.FilterFid:
-                    if _f.id() != self._request.filterFid():
-                        continue
                         
                 f.setGeometry(_f.geometry())
                 self.geometryToDestinationCrs(f, self._transform)
@@ -216,9 +540,72 @@ class FrostFeatureIteratorImpl(QgsAbstractFeatureIterator):
                 f.setId(_f.id())
                 return True
         except IndexError:
+            # no more rows (the snapshot is kept until closed, to rewind)
             f.setValid(False)
             return False
 
+    def _fetchRow(self, store, row, f):
+        """Fills a feature from a store row, with the requested 
+           attributes and geometry only"""
+        f.setFields(self._fields)
+        f.setId(store.fids[row])
+        if self._attributes is None:
+            f.setAttributes(store.attributes(row))
+        else:
+            attrs = [None] * self._fields.count()
+            for i in self._attributes:
+                attrs[i] = store.columns[i][row]
+            f.setAttributes(attrs)
+        if self._fetch_geometry and store.hasGeometry(row):
+            f.setGeometry(store.geometry(row))
+            self.geometryToDestinationCrs(f, self._transform)
+        else:
+            f.clearGeometry()
+        f.setValid(True)
+
+# 
+#-----------------------------------------------------------
+class FrostBoundsIteratorImpl(QgsAbstractFeatureIterator):
+    """Internal iterator of the store bounding boxes as feature 
+       geometries, to bulk load a spatial index"""
+    
+    def __init__(self, store, size):
+        """Constructor"""
+        super().__init__(QgsFeatureRequest())
+        self._store = store
+        self._size = size
+        self._index = 0
+    
+    def rewind(self):
+        """Reset the iterator to the starting position"""
+        self._index = 0
+        return True
+    
+    def close(self):
+        """End of iterating"""
+        self._index = self._size
+        return True
+    
+    def fetchFeature(self, f):
+        """Fetch next row with a geometry, return true on success"""
+        store = self._store
+        while self._index < self._size:
+            row = self._index
+            self._index += 1
+            if not store.hasGeometry(row):
+                continue
+            xmin, ymin, xmax, ymax = store.xmin[row], store.ymin[row], store.xmax[row], store.ymax[row]
+            if xmin == xmax and ymin == ymax:
+                geom = QgsGeometry.fromPointXY(QgsPointXY(xmin, ymin))
+            else:
+                geom = QgsGeometry.fromRect(QgsRectangle(xmin, ymin, xmax, ymax))
+            f.setId(store.fids[row])
+            f.setGeometry(geom)
+            f.setValid(True)
+            return True
+        f.setValid(False)
+        return False
+
 # 
 #-----------------------------------------------------------
 class FrostFeatureIterator(QgsFeatureIterator):
@@ -229,6 +616,14 @@ class FrostFeatureIterator(QgsFeatureIterator):
     def __init__(self, it):
         super().__init__(it)
         FrostFeatureIterator._kept_refs.append(it)
+    
+    @staticmethod
+    def release(it):
+        """Drops the reference to a closed iterator"""
+        try:
+            FrostFeatureIterator._kept_refs.remove(it)
+        except ValueError:
+            pass
 # 
 #-----------------------------------------------------------
 class FrostFeatureSource(QgsAbstractFeatureSource):
@@ -242,26 +637,384 @@ class FrostFeatureSource(QgsAbstractFeatureSource):
         self._expression_context.appendScope(QgsExpressionContextUtils.globalScope())
         self._expression_context.appendScope(QgsExpressionContextUtils.projectScope(QgsProject.instance()))
         self._expression_context.setFields(self._provider.fields())
-        if self._provider.subsetString():
-            self._subset_expression = QgsExpression(self._provider.subsetString())
+        if self._provider.localSubsetString():
+            self._subset_expression = QgsExpression(self._provider.localSubsetString())
             self._subset_expression.prepare(self._expression_context)
         else:
             self._subset_expression = None
         
     def requestProviderFeatures(self):
-        """Returns provided features"""
+        """Returns the provider feature store"""
         return self._provider.requestFeatures()
 
     def getFeatures(self, request):
         """Gets an iterator for features matching the specified request"""
         return FrostFeatureIterator(FrostFeatureIteratorImpl(self, request))
 
+# 
+#-----------------------------------------------------------
+class FrostLoadTask(QgsTask):
+    """Task to load Frost data in background"""
+    
+    loaded = pyqtSignal(object, object)
+    pageLoaded = pyqtSignal(object, object)
+    
+    def __init__(self, description, url, targets, revalidate=False):
+        """Constructor: targets is a list of (converter, field count),
+           one for each feature store to fill"""
+        super().__init__(description, QgsTask.CanCancel)
+        self._url = url
+        self._targets = targets
+        self._revalidate = revalidate
+        self._stores = None
+        self._spatialindexes = None
+        
+    def run(self):
+        """Loads data into new feature stores (worker thread)"""
+        try:
+            self._stores = FrostProvider.loadStores(
+                self._url, 
+                self._targets, 
+                callback=self._onProgress,
+                revalidate=self._revalidate,
+                is_canceled=self.isCanceled,
+                on_page=self._onPage)
+            if self._stores is None:
+                return False
+            
+            # bulk load the final spatial indexes off the main thread
+            self._spatialindexes = [
+                FrostDataset.bulkSpatialIndex(store, store.appendedCount()) for store in self._stores
+            ]
+            return not self.isCanceled()
+            
+        except Exception as ex:
+            QgsMessageLog.logMessage(str(ex), __FROST_PROVIDER_NAME__, Qgis.Critical)
+            QgsMessageLog.logMessage(traceback.format_exc(), __FROST_PROVIDER_NAME__, Qgis.Critical)
+            return False
+        
+    def finished(self, result):
+        """Emits the loaded feature stores and their spatial indexes (main thread)"""
+        if result:
+            self.loaded.emit(self._stores, self._spatialindexes)
+        else:
+            self.loaded.emit(None, None)
+        
+    def _onPage(self, stores):
+        """Publishes the rows loaded so far (worker thread)"""
+        self.pageLoaded.emit(stores, [store.appendedCount() for store in stores])
+        
+    def _onProgress(self, num, count):
+        """Updates the task progress"""
+        try:
+            count = int(count)
+        except (TypeError, ValueError):
+            return
+        if count > 0:
+            self.setProgress(min(100.0, 100.0 * num / count))
+
+# 
+#-----------------------------------------------------------
+class FrostLoadJob(QObject):
+    """Background load of an url feeding the datasets of its geometry types"""
+    
+    def __init__(self, url, datasets, revalidate=False):
+        """Constructor"""
+        super().__init__()
+        self._datasets = list(datasets)
+        self._task = FrostLoadTask(
+            "{} {}".format(QCoreApplication.translate('FrostProvider', "Loading Frost layer"), url),
+            url,
+            [(dataset.converter, dataset.field_count) for dataset in self._datasets],
+            revalidate=revalidate)
+        self._task.loaded.connect(self._onLoaded)
+        self._task.pageLoaded.connect(self._onPageLoaded)
+        QgsApplication.taskManager().addTask(self._task)
+        
+    def detach(self, dataset):
+        """Stops feeding a dataset; cancels the load if no more needed"""
+        self._datasets = [None if ds is dataset else ds for ds in self._datasets]
+        if any(ds is not None for ds in self._datasets):
+            return
+        task = self._task
+        self._task = None
+        if task is not None:
+            try:
+                task.loaded.disconnect(self._onLoaded)
+                task.pageLoaded.disconnect(self._onPageLoaded)
+                task.cancel()
+            except (TypeError, RuntimeError):
+                # already finished
+                pass
+    
+    def _onPageLoaded(self, stores, counts):
+        """Publishes the rows of a page to each dataset"""
+        if self._task is None or self.sender() is not self._task:
+            # stale page of a canceled task
+            return
+        for dataset, store, count in zip(self._datasets, stores, counts):
+            if dataset is not None:
+                dataset.receivePage(self, store, count)
+    
+    def _onLoaded(self, stores, spatialindexes):
+        """Swaps the loaded stores and spatial indexes into each dataset"""
+        self._task = None
+        for index, dataset in enumerate(self._datasets):
+            if dataset is not None:
+                dataset.receiveLoaded(
+                    self, 
+                    stores[index] if stores else None, 
+                    spatialindexes[index] if spatialindexes else None)
+
+# 
+#-----------------------------------------------------------
+class FrostDataset(QObject):
+    """Features of a Frost source, shared by its providers"""
+    
+    dataPublished = pyqtSignal()
+    loadingFinished = pyqtSignal(bool)
+    
+    def __init__(self, url, wkb_type, def_wkb_type, field_count, group_key=None, prefetch_key=None):
+        """Constructor: datasets of the same group key (same url, other 
+           geometry types) can be loaded by a single fetch; prefetch_key is
+           the key of the rows already downloaded by a connection"""
+        super().__init__()
+        self.url = url
+        self.group_key = group_key
+        self.prefetch_key = prefetch_key
+        self.converter = FrostRowConverter(wkb_type, def_wkb_type)
+        self.field_count = field_count
+        self.store = FrostFeatureStore(field_count)
+        self.spatialindex = None
+        self.loaded = False
+        self.loading = False
+        self._job = None
+        self._extent = None
+        self._attribute_indexes = {}
+        self._lock = threading.RLock()
+        self._load_lock = threading.RLock()
+        
+        # receive task signals in the main thread
+        app = QCoreApplication.instance()
+        if app is not None and self.thread() != app.thread():
+            self.moveToThread(app.thread())
+    
+    def setStore(self, store, spatialindex=None):
+        """Swaps in a new feature store (stores are never modified once 
+           published: a reload creates a new one) with its spatial index
+           (bulk loaded now if not given for all the published rows)"""
+        size = len(store)
+        index = FrostDataset.bulkSpatialIndex(store, size) if spatialindex is None else spatialindex
+        with self._lock:
+            self.store = store
+            self._extent = None
+            self._attribute_indexes = {}
+            # add rows published while building the index
+            FrostDataset.indexRows(index, store, size, len(store))
+            self.spatialindex = index
+    
+    def createSpatialIndex(self):
+        """Creates the spatial index of the published features"""
+        with self._lock:
+            if self.spatialindex is not None:
+                return self.spatialindex
+            store = self.store
+        size = len(store)
+        index = FrostDataset.bulkSpatialIndex(store, size)
+        with self._lock:
+            if self.store is store and self.spatialindex is None:
+                FrostDataset.indexRows(index, store, size, len(store))
+                self.spatialindex = index
+            return self.spatialindex
+    
+    @staticmethod
+    def bulkSpatialIndex(store, size):
+        """Returns a spatial index of the first rows of a store, 
+           bulk loaded (STR packed) from the stored bounding boxes"""
+        impl = FrostBoundsIteratorImpl(store, size)
+        return QgsSpatialIndex(QgsFeatureIterator(impl))
+    
+    @staticmethod
+    def indexRows(spatialindex, store, first_row, last_row):
+        """Inserts rows of a store into a spatial index one by one"""
+        for row in range(first_row, last_row):
+            if store.hasGeometry(row):
+                spatialindex.addFeature(store.fids[row], store.boundingBox(row))
+    
+    def attributeIndex(self, field_index, store=None):
+        """Returns the attribute index of a field for the current version
+           of a store (built on first use), None if values not indexable"""
+        with self._lock:
+            store = self.store if store is None else store
+            index = self._attribute_indexes.get(field_index)
+            if index is None or not index.matches(store):
+                try:
+                    index = FrostAttributeIndex(store, field_index)
+                except TypeError:
+                    # unhashable values
+                    return None
+                if store is self.store:
+                    self._attribute_indexes[field_index] = index
+            return index
+    
+    def publish(self, store, count=None):
+        """Makes loaded rows visible, adding them to the spatial index
+           and extent; returns true if new rows are visible"""
+        with self._lock:
+            first_row = len(store)
+            store.publish(count)
+            last_row = len(store)
+            if last_row <= first_row:
+                return False
+            self.addRows(store, first_row, last_row)
+            return True
+    
+    def addRows(self, store, first_row, last_row):
+        """Adds visible rows to the spatial index and extent (a loading
+           store gets its bulk loaded index when completed)"""
+        with self._lock:
+            if self.spatialindex is not None:
+                FrostDataset.indexRows(self.spatialindex, store, first_row, last_row)
+            if self._extent is not None:
+                self._extent.combineExtentWith(store.extent(range(first_row, last_row)))
+    
+    def extent(self):
+        """Returns the extent of the published features"""
+        with self._lock:
+            if self._extent is None:
+                self._extent = self.store.extent()
+            return QgsRectangle(self._extent)
+    
+    def siblings(self):
+        """Returns the registered datasets of the same group (other geometry
+           types of the same url) neither loaded nor loading"""
+        if self.group_key is None:
+            return []
+        return [
+            dataset for dataset in FrostDatasetRegistry.datasets()
+            if dataset is not self and dataset.group_key == self.group_key and
+               not dataset.loaded and not dataset.loading
+        ]
+    
+    def load(self, revalidate: bool=False):
+        """Loads features in the calling thread (with the siblings)"""
+        with self._load_lock:
+            if not self.loaded or revalidate:
+                datasets = [self] + self.siblings()
+                if not revalidate and self._loadPrefetched(datasets):
+                    return self.store
+                try:
+                    stores = FrostProvider.loadStores(
+                        self.url, 
+                        [(dataset.converter, dataset.field_count) for dataset in datasets], 
+                        revalidate=revalidate)
+                except Exception as ex:
+                    # failed: mark as loaded with no features, so that only 
+                    # an explicit reload requests the data again
+                    QgsMessageLog.logMessage(str(ex), __FROST_PROVIDER_NAME__, Qgis.Critical)
+                    QgsMessageLog.logMessage(traceback.format_exc(), __FROST_PROVIDER_NAME__, Qgis.Critical)
+                    stores = [FrostFeatureStore(dataset.field_count) for dataset in datasets]
+                for dataset, store in zip(datasets, stores):
+                    dataset.setStore(store)
+                    dataset.loaded = True
+        return self.store
+    
+    def startLoading(self, revalidate: bool=False):
+        """Starts loading features in a background task (with the siblings)"""
+        if self.loading and not revalidate:
+            return
+        self.cancelLoading()
+        
+        datasets = [self] + self.siblings()
+        if not revalidate and self._loadPrefetched(datasets):
+            for dataset in datasets:
+                dataset.loadingFinished.emit(True)
+            return
+        job = FrostLoadJob(self.url, datasets, revalidate=revalidate)
+        for dataset in datasets:
+            dataset._job = job
+            dataset.loading = True
+    
+    def _loadPrefetched(self, datasets):
+        """Fills the datasets with the rows already downloaded by a
+           connection, returns false if not available"""
+        rows = FrostPrefetchedRows.rows(self.prefetch_key)
+        if rows is None:
+            return False
+        targets = [(dataset.converter, dataset.field_count) for dataset in datasets]
+        stores = [FrostFeatureStore(field_count) for _, field_count in targets]
+        FrostProvider.appendRows(targets, stores, rows)
+        for dataset, store in zip(datasets, stores):
+            dataset.setStore(store)
+            dataset.loaded = True
+        QgsMessageLog.logMessage(
+            "{}: {} rows ({})".format(
+                QCoreApplication.translate(__FROST_PROVIDER_NAME__, "Data handed off by connection"),
+                len(rows), self.url),
+            __FROST_PROVIDER_NAME__, 
+            Qgis.Info)
+        return True
+    
+    def cancelLoading(self):
+        """Cancels the background loading of features"""
+        job = self._job
+        self._job = None
+        if job is not None:
+            job.detach(self)
+        self.loading = False
+    
+    def close(self):
+        """Releases the dataset resources (no more providers)"""
+        self.cancelLoading()
+    
+    def receivePage(self, job, store, count):
+        """Publishes the rows of a page loaded in background"""
+        if job is not self._job:
+            # stale page of a canceled load
+            return
+        if store is not self.store:
+            # first page: swap in the loading store
+            self.setStore(store)
+        if self.publish(store, count):
+            self.dataPublished.emit()
+    
+    def receiveLoaded(self, job, store, spatialindex=None):
+        """Swaps in the features loaded in background, with the spatial
+           index bulk loaded by the task (replacing the one filled page 
+           by page while loading)"""
+        if job is not self._job:
+            return
+        self._job = None
+        self.loading = False
+        if store is None:
+            # canceled or failed: keep current features
+            self.loadingFinished.emit(False)
+            return
+        
+        with self._lock:
+            if spatialindex is None:
+                if store is not self.store:
+                    self.setStore(store)
+                self.publish(store)
+            elif store is not self.store:
+                store.publish()
+                self.setStore(store, spatialindex)
+            else:
+                # publish the last rows, swapping in the final index
+                first_row = len(store)
+                store.publish()
+                if self._extent is not None:
+                    self._extent.combineExtentWith(store.extent(range(first_row, len(store))))
+                self.spatialindex = spatialindex
+        self.loaded = True
+        self.loadingFinished.emit(True)
+
 # 
 #-----------------------------------------------------------
 class FrostProvider(QgsVectorDataProvider):
     """Derived class for Frost vector data provider"""
     
-    next_feature_id = 1
+    loadingFinished = pyqtSignal(bool)
 
     @classmethod
     def providerKey(cls):
@@ -291,96 +1044,569 @@ class FrostProvider(QgsVectorDataProvider):
         return url
     
     @staticmethod
-    def getDataCount(url):
-        """Get total rows of data"""
-        # compose url
-        url = QUrl(url)
-        query = QUrlQuery(url.query())
-        query.addQueryItem('$count', 'true')
-        query.addQueryItem('$top', '1')
-        url.setQuery(query)
-        # create request
-        nam = QgsNetworkAccessManager.instance()
+    def _isMainThread():
+        """Returns true if running in the main (GUI) thread"""
+        return QThread.currentThread() == QCoreApplication.instance().thread()
+    
+    @staticmethod
+    def _createRequest(url):
+        """Creates a data page request"""
         request = QNetworkRequest(QUrl(url))
         request.setPriority(QNetworkRequest.HighPriority)
-        request.setAttribute(QNetworkRequest.HttpPipeliningAllowedAttribute, True)
+        #request.setAttribute(QNetworkRequest.HttpPipeliningAllowedAttribute, True)
+        # no cache
         request.setAttribute(QNetworkRequest.CacheLoadControlAttribute, QNetworkRequest.AlwaysNetwork)
         request.setAttribute(QNetworkRequest.CacheSaveControlAttribute, False)
-        reply = nam.blockingGet(request)
-            
+        return request
+    
+    @staticmethod
+    def _getReply(nam, request):
+        """Sends a GET request: waits processing events in the main thread,
+           blocks in worker threads (render jobs)"""
+        if not FrostProvider._isMainThread():
+            return nam.blockingGet(request)
+        
+        reply = nam.get(request)
+        while reply.isRunning() :
+            QgsApplication.processEvents(QEventLoop.ExcludeUserInputEvents)
+        reply.deleteLater()
+        return reply
+    
+    @staticmethod
+    def _waitReplies(replies):
+        """Waits until at least one of the replies is finished"""
+        if any(reply.isFinished() for reply in replies):
+            return
+        
+        if FrostProvider._isMainThread():
+            while not any(reply.isFinished() for reply in replies):
+                QgsApplication.processEvents(QEventLoop.ExcludeUserInputEvents)
+        else:
+            loop = QEventLoop()
+            for reply in replies:
+                reply.finished.connect(loop.quit)
+            if not any(reply.isFinished() for reply in replies):
+                loop.exec_()
+    
+    @staticmethod
+    def _checkReply(reply):
+        """Checks a page reply and returns its raw body"""
         # check if error
         if reply.error() != QNetworkReply.NoError:
-            return '????'
+            raise Exception(reply.errorString())
             
-        # get data
-        response = json.loads(str(reply.content(), 'utf-8')) or {}
-        return response.get("@iot.count", '????')
+        status_code = reply.attribute(QNetworkRequest.HttpStatusCodeAttribute)
+        if status_code != 200:
+            msg = QCoreApplication.translate(__FROST_PROVIDER_NAME__, "HTTP request failed; response code")
+            raise Exception("{}: {}".format(msg, status_code))
         
+        return FrostProvider._replyContent(reply)
+    
+    @staticmethod
+    def _isRetryable(reply):
+        """Returns true if a failed page request could succeed if retried"""
+        status_code = reply.attribute(QNetworkRequest.HttpStatusCodeAttribute)
+        if status_code is None:
+            # network failure (timeout, connection reset, ...)
+            return reply.error() != QNetworkReply.NoError
+        return status_code >= 500 or status_code in (408, 429)
     
     @staticmethod
-    def requestData(url, callback=None):
-        """Load data from Frost server"""
+    def pagingRetries():
+        """Returns the number of retries of a failed page request"""
+        try:
+            value = int(QgsSettings().value(f"{__FROST_PROVIDER_NAME__}/paging/retries", __FROST_DEFAULT_RETRIES__))
+        except (TypeError, ValueError):
+            value = __FROST_DEFAULT_RETRIES__
+        return max(value, 0)
+    
+    @staticmethod
+    def _backoff(attempt, url):
+        """Waits before retrying a page request (exponential backoff)"""
+        try:
+            delay = int(QgsSettings().value(f"{__FROST_PROVIDER_NAME__}/paging/retryDelay", __FROST_DEFAULT_RETRY_DELAY__))
+        except (TypeError, ValueError):
+            delay = __FROST_DEFAULT_RETRY_DELAY__
+        delay = max(delay, 0) * (2 ** (attempt - 1)) / 1000.0
         
-        # init
-        rows = []
+        QgsMessageLog.logMessage(
+            "{} {} ({:.1f} s): {}".format(
+                QCoreApplication.translate(__FROST_PROVIDER_NAME__, "Page request failed; retry"),
+                attempt, delay, url),
+            __FROST_PROVIDER_NAME__, 
+            Qgis.Warning)
         
+        if FrostProvider._isMainThread():
+            deadline = time.monotonic() + delay
+            while time.monotonic() < deadline:
+                QgsApplication.processEvents(QEventLoop.ExcludeUserInputEvents)
+                QThread.msleep(20)
+        else:
+            time.sleep(delay)
+    
+    @staticmethod
+    def _readPage(reply):
+        """Checks a page reply and returns its raw body, decoded JSON 
+           and cache validator headers"""
+        content = FrostProvider._checkReply(reply)
+        response = json.loads(str(content, 'utf-8')) or {}
+        headers = {name: FrostProvider._replyHeader(reply, name) for name in ('ETag', 'Last-Modified')}
+        return content, response, headers
+    
+    @staticmethod
+    def _peekNextLink(content):
+        """Extracts the next link from the head or the tail of a raw page body, 
+           without decoding the whole page"""
+        for part in (content[:__FROST_PEEK_SIZE__], content[-__FROST_PEEK_SIZE__:]):
+            match = __FROST_NEXT_LINK_RE__.search(part)
+            if match:
+                try:
+                    return json.loads(b'"' + match.group(1) + b'"')
+                except (UnicodeDecodeError, JSONDecodeError):
+                    return None
+        return None
+    
+    @staticmethod
+    def pagingConcurrency():
+        """Returns the number of concurrent page requests (1: sequential paging)"""
         try:
-            # get total rows of data
-            num_rows = 0
-            total_rows = FrostProvider.getDataCount(url)
-            
-            # create request
-            # https://ogc-demo.k8s.ilt-dmz.iosb.fraunhofer.de/v1.1/Locations?$top=2147483647
-            url = FrostProvider.correctQurlParams(url)
-            nam = QgsNetworkAccessManager.instance()
-            next_url = url.toString()
-            
-            # create request
-            request = QNetworkRequest(QUrl(next_url))
-            request.setPriority(QNetworkRequest.HighPriority)
-            #request.setAttribute(QNetworkRequest.HttpPipeliningAllowedAttribute, True)
-            # no cache
-            request.setAttribute(QNetworkRequest.CacheLoadControlAttribute, QNetworkRequest.AlwaysNetwork)
-            request.setAttribute(QNetworkRequest.CacheSaveControlAttribute, False)
-            
-            # loop all page request
-            while next_url:
-                # create request
-                request.setUrl(QUrl(next_url))
+            value = int(QgsSettings().value(f"{__FROST_PROVIDER_NAME__}/paging/concurrency", __FROST_DEFAULT_CONCURRENCY__))
+        except (TypeError, ValueError):
+            value = __FROST_DEFAULT_CONCURRENCY__
+        return max(value, 1)
+    
+    @staticmethod
+    def _windowUrl(url, skip, top):
+        """Returns the url of a $skip/$top data window"""
+        url = QUrl(url)
+        query = QUrlQuery(url.query())
+        query.removeAllQueryItems('$skip')
+        query.removeAllQueryItems('$top')
+        query.removeAllQueryItems('$count')
+        query.addQueryItem('$skip', str(skip))
+        query.addQueryItem('$top', str(top))
+        url.setQuery(query)
+        return url.toString()
+    
+    @staticmethod
+    def _isAfter(value, last_value):
+        """Returns true if an @iot.id value follows another one"""
+        try:
+            return value > last_value
+        except TypeError:
+            return value != last_value
+    
+    @staticmethod
+    def _iterWindows(nam, url, start, sizer, total_rows, concurrency, last_id):
+        """Yields (raw body, decoded JSON, headers) of $skip/$top windows 
+           requested concurrently, in collection order; window sizes
+           are tuned by the page sizer"""
+        pending = deque()
+        plan_skip = start
+        active = {}
+        results = {}
+        next_skip = start
+        validated = False
+        retries = FrostProvider.pagingRetries()
+        attempts = {}
+        try:
+            while pending or plan_skip < total_rows or active or next_skip in results:
+                # send requests up to the concurrency cap
+                while len(active) < concurrency:
+                    if pending:
+                        skip, top = pending.popleft()
+                    elif plan_skip < total_rows:
+                        skip, top = plan_skip, min(sizer.top, total_rows - plan_skip)
+                        plan_skip += top
+                    else:
+                        break
+                    request = FrostProvider._createRequest(FrostProvider._windowUrl(url, skip, top))
+                    active[nam.get(request)] = (skip, top, time.perf_counter())
+                
+                # collect finished replies
+                if active:
+                    FrostProvider._waitReplies(list(active.keys()))
+                for reply in [r for r in active if r.isFinished()]:
+                    skip, top, sent = active.pop(reply)
+                    try:
+                        content, response, headers = FrostProvider._readPage(reply)
+                    except Exception:
+                        if not validated:
+                            raise FrostSkipNotSupported()
+                        attempt = attempts.get(skip, 0) + 1
+                        if attempt > retries or not FrostProvider._isRetryable(reply):
+                            raise
+                        # retry the window later
+                        attempts[skip] = attempt
+                        FrostProvider._backoff(attempt, reply.url().toString())
+                        pending.appendleft((skip, top))
+                        continue
+                    finally:
+                        reply.deleteLater()
+                    count = len(response.get('value', []) or [])
+                    truncated = 0 < count < top
+                    sizer.observe(top, count, time.perf_counter() - sent, truncated)
+                    if truncated:
+                        # page truncated by the server: request the remainder
+                        pending.appendleft((skip + count, top - count))
+                    results[skip] = (content, response, headers, count)
                 
-                # send request 
-                #reply = nam.blockingGet(request)
-                reply = nam.get(request)
-                while reply.isRunning() :
-                    QgsApplication.processEvents(QEventLoop.ExcludeUserInputEvents)
+                # yield contiguous windows
+                while next_skip in results:
+                    content, response, headers, count = results.pop(next_skip)
+                    if count == 0:
+                        # collection shrinked: end of data
+                        return
+                    if not validated:
+                        # server must honour $skip
+                        first_id = response['value'][0].get('@iot.id')
+                        if not FrostProvider._isAfter(first_id, last_id):
+                            raise FrostSkipNotSupported()
+                        validated = True
+                    next_skip += count
+                    yield content, response, headers
+        finally:
+            for reply in active:
+                reply.abort()
                 reply.deleteLater()
+    
+    @staticmethod
+    def _iterNextLinks(nam, url, stats, prefetch_first=True):
+        """Yields (raw body, decoded JSON, headers) of pages following next links;
+           the next page is already requested while the current one is decoded
+           and consumed (double buffering)"""
+        reply = nam.get(FrostProvider._createRequest(url))
+        prefetch = prefetch_first
+        retries = FrostProvider.pagingRetries()
+        attempt = 0
+        try:
+            while reply is not None:
+                # wait current page
+                start = time.perf_counter()
+                FrostProvider._waitReplies([reply])
+                stats.wait += time.perf_counter() - start
                 
-                # check if error
-                if reply.error() != QNetworkReply.NoError:
-                    raise Exception(reply.errorString())
-                    
-                status_code = reply.attribute(QNetworkRequest.HttpStatusCodeAttribute)
-                if status_code != 200:
-                    msg = QCoreApplication.translate(__FROST_PROVIDER_NAME__, "HTTP request failed; response code")
-                    raise Exception("{}: {}".format(msg, status_code))
-                    
-                # get data
-                #response = json.loads(str(reply.content(), 'utf-8')) or {}
-                if hasattr(reply, 'readAll'):
-                    response = json.loads(str( reply.readAll().data(), 'utf-8' ))
-                else:
-                    response = json.loads(str( reply.content(), 'utf-8' ))
+                current, reply = reply, None
+                if attempt < retries and current.error() != QNetworkReply.NoError and FrostProvider._isRetryable(current):
+                    # retry the same page
+                    attempt += 1
+                    current_url = current.request().url()
+                    current.deleteLater()
+                    FrostProvider._backoff(attempt, current_url.toString())
+                    reply = nam.get(FrostProvider._createRequest(current_url))
+                    continue
+                attempt = 0
+                try:
+                    content = FrostProvider._checkReply(current)
+                    headers = {name: FrostProvider._replyHeader(current, name) for name in ('ETag', 'Last-Modified')}
+                finally:
+                    current.deleteLater()
+                
+                # request next page before decoding the current one
+                next_link = FrostProvider._peekNextLink(content) if prefetch else None
+                if next_link:
+                    # rows are counted by the first page only
+                    next_link = FrostProvider._countUrl(next_link, False)
+                    reply = nam.get(FrostProvider._createRequest(next_link))
+                
+                # decode and consume current page
+                start = time.perf_counter()
+                response = json.loads(str(content, 'utf-8')) or {}
+                actual_link = response.get("@iot.nextLink")
+                if actual_link:
+                    actual_link = FrostProvider._countUrl(actual_link, False)
+                if prefetch and actual_link != next_link:
+                    # wrong guess: request the actual next page
+                    if reply is not None:
+                        reply.abort()
+                        reply.deleteLater()
+                    reply = nam.get(FrostProvider._createRequest(actual_link)) if actual_link else None
+                
+                yield content, response, headers
+                
+                stats.addPage(content, time.perf_counter() - start, reply is not None, len(response.get('value', []) or []))
+                
+                # request next page (not prefetched)
+                if not prefetch and actual_link:
+                    reply = nam.get(FrostProvider._createRequest(actual_link))
+                prefetch = True
+        finally:
+            if reply is not None:
+                reply.abort()
+                reply.deleteLater()
+    
+    @staticmethod
+    def _countUrl(url, count: bool=True):
+        """Returns an url with (or without) the $count=true parameter"""
+        url = QUrl(url)
+        query = QUrlQuery(url.query())
+        if count == query.hasQueryItem('$count'):
+            return url.toString()
+        query.removeAllQueryItems('$count')
+        if count:
+            query.addQueryItem('$count', 'true')
+        url.setQuery(query)
+        return url.toString()
+    
+    @staticmethod
+    def _iterPages(url):
+        """Yields (raw body, decoded JSON, headers) of each data page, in collection order;
+           the first page also returns the total rows (@iot.count)"""
+        nam = QgsNetworkAccessManager.instance()
+        stats = FrostLoadStats(url)
+        
+        # check if concurrent $skip windows are possible
+        concurrency = FrostProvider.pagingConcurrency()
+        query = QUrlQuery(QUrl(url).query())
+        windows = concurrency > 1 and not query.hasQueryItem('$skip')
+        
+        # first page, counting rows
+        pages = FrostProvider._iterNextLinks(
+            nam, FrostProvider._countUrl(url), stats, prefetch_first=not windows)
+        page = next(pages)
+        yield page
+        response = page[1]
+        read_rows = response.get('value', []) or []
+        next_url = response.get("@iot.nextLink")
+        total_rows = response.get('@iot.count')
+        try:
+            # honour an explicit $top of the url
+            total_rows = min(total_rows, int(query.queryItemValue('$top')))
+        except (TypeError, ValueError):
+            pass
+        
+        # concurrent $skip windows
+        if windows and isinstance(total_rows, int) and next_url and read_rows and total_rows > len(read_rows):
+            pages.close()
+            sizer = FrostPageSizer(url, len(read_rows), True)
+            try:
+                for page in FrostProvider._iterWindows(
+                        nam, url, len(read_rows), sizer, total_rows, concurrency, read_rows[-1].get('@iot.id')):
+                    start = time.perf_counter()
+                    yield page
+                    stats.addPage(page[0], time.perf_counter() - start, True, len(page[1].get('value', []) or []))
+                sizer.save()
+                stats.log()
+                return
+            except FrostSkipNotSupported:
+                QgsMessageLog.logMessage(
+                    QCoreApplication.translate(__FROST_PROVIDER_NAME__, "Server does not support $skip paging; following next links"),
+                    __FROST_PROVIDER_NAME__, 
+                    Qgis.Info)
+                pages = FrostProvider._iterNextLinks(nam, FrostProvider._countUrl(next_url, False), stats)
+        
+        # loop all page request
+        yield from pages
+        stats.log()
+    
+    @staticmethod
+    def _replyContent(reply):
+        """Returns the body of a reply as bytes"""
+        if hasattr(reply, 'readAll'):
+            return reply.readAll().data()
+        return bytes(reply.content())
+    
+    @staticmethod
+    def _replyHeader(reply, name):
+        """Returns a raw header of a reply as string"""
+        return bytes(reply.rawHeader(name.encode())).decode('latin-1')
+    
+    @staticmethod
+    def _validateCache(entry):
+        """Checks if cached data are still valid: conditional request 
+           if the server supplied validators, else count and max id probe"""
+        nam = QgsNetworkAccessManager.instance()
+        url = QUrl(entry.url)
+        conditional = bool(entry.etag or entry.last_modified)
+        if not conditional:
+            # probe url
+            query = QUrlQuery(url.query())
+            for name in ('$count', '$top', '$orderby', '$select'):
+                query.removeAllQueryItems(name)
+            query.addQueryItem('$count', 'true')
+            query.addQueryItem('$top', '1')
+            query.addQueryItem('$orderby', '@iot.id desc')
+            query.addQueryItem('$select', 'id')
+            url.setQuery(query)
+            
+        request = QNetworkRequest(url)
+        request.setPriority(QNetworkRequest.HighPriority)
+        request.setAttribute(QNetworkRequest.CacheLoadControlAttribute, QNetworkRequest.AlwaysNetwork)
+        request.setAttribute(QNetworkRequest.CacheSaveControlAttribute, False)
+        if entry.etag:
+            request.setRawHeader(b'If-None-Match', entry.etag.encode('latin-1'))
+        if entry.last_modified:
+            request.setRawHeader(b'If-Modified-Since', entry.last_modified.encode('latin-1'))
+        
+        reply = FrostProvider._getReply(nam, request)
+        if reply.error() != QNetworkReply.NoError:
+            return False
+        status_code = reply.attribute(QNetworkRequest.HttpStatusCodeAttribute)
+        if conditional:
+            return status_code == 304
+        if status_code != 200:
+            return False
+        
+        response = json.loads(str(FrostProvider._replyContent(reply), 'utf-8')) or {}
+        values = response.get('value', []) or []
+        max_id = values[0].get('@iot.id') if values else None
+        return response.get('@iot.count') == entry.row_count and max_id == entry.max_id
+    
+    @staticmethod
+    def _isCacheValid(cache, url, revalidate=False):
+        """Returns true if cached data of an url exist and are still valid"""
+        entry = cache.entry(url)
+        if entry is None:
+            return False
+        if revalidate or entry.age > cache.ttl():
+            if not FrostProvider._validateCache(entry):
+                return False
+            cache.touch(url)
+        return True
+    
+    @staticmethod
+    def iterData(url, callback=None, use_cache=True, revalidate=False):
+        """Yields data rows from Frost server (or from the local cache), page by page"""
+        
+        # init
+        cache = FrostLocationCache() if use_cache and FrostLocationCache.enabled() else None
+        
+        # create request
+        # https://ogc-demo.k8s.ilt-dmz.iosb.fraunhofer.de/v1.1/Locations?$top=2147483647
+        url = FrostProvider.correctQurlParams(url).toString()
+        num_rows = 0
+        total_rows = '????'
+        etag = last_modified = ''
+        max_id = None
+        first_page = 0
+        resume_url = None
+        
+        # read from local cache
+        load_id = None
+        try:
+            if cache is not None:
+                try:
+                    if FrostProvider._isCacheValid(cache, url, revalidate):
+                        for content in cache.pages(url):
+                            read_rows = json.loads(str(content, 'utf-8')).get('value', []) or []
+                            num_rows += len(read_rows)
+                            if callback:
+                                callback(num_rows, num_rows)
+                            yield read_rows
+                        return
+                
+                    # resume an interrupted load from its stored pages
+                    # (not while another load of the url is running)
+                    partial = None if revalidate else cache.partial(url)
+                    if partial is not None and partial.age < FrostLocationCache.ttl():
+                        load_id = cache.resume(url)
+                    if load_id is not None:
+                        etag, last_modified = partial.etag, partial.last_modified
+                        next_link = None
+                        for content in cache.pages(url):
+                            response = json.loads(str(content, 'utf-8')) or {}
+                            read_rows = response.get('value', []) or []
+                            if first_page == 0:
+                                total_rows = response.get('@iot.count', total_rows)
+                            first_page += 1
+                            num_rows += len(read_rows)
+                            if read_rows:
+                                max_id = read_rows[-1].get('@iot.id')
+                            next_link = response.get("@iot.nextLink")
+                            if callback:
+                                callback(num_rows, total_rows)
+                            yield read_rows
+                        if next_link:
+                            resume_url = FrostProvider._countUrl(next_link, False)
+                        else:
+                            resume_url = FrostProvider._resumeUrl(url, num_rows)
+                        QgsMessageLog.logMessage(
+                            "{}: {} ({})".format(
+                                QCoreApplication.translate(__FROST_PROVIDER_NAME__, "Resuming interrupted load after rows"),
+                                num_rows, url),
+                            __FROST_PROVIDER_NAME__, 
+                            Qgis.Info)
+                    else:
+                        load_id = cache.begin(url)
                     
+                except (OSError, sqlite3.Error) as ex:
+                    # local cache not available: load (the remaining rows) from the network
+                    FrostProvider._logCacheError(ex)
+                    cache = None
+                    if num_rows and resume_url is None:
+                        resume_url = FrostProvider._resumeUrl(url, num_rows)
+            
+            # loop all pages (total rows of data from the first one)
+            for page, (content, response, headers) in enumerate(
+                    FrostProvider._iterPages(resume_url or url), start=first_page):
                 read_rows = response.get('value', []) or []
-                rows.extend(read_rows)
+                if page == 0:
+                    total_rows = response.get('@iot.count', total_rows)
+                num_rows += len(read_rows)
+                if read_rows:
+                    max_id = read_rows[-1].get('@iot.id')
                 
-                # get next data page
-                next_url = response.get("@iot.nextLink")
+                # store page into local cache (kept if the load is interrupted,
+                # not stored if superseded by another load of the url)
+                if cache is not None:
+                    try:
+                        if page == 0:
+                            etag = headers.get('ETag', '')
+                            last_modified = headers.get('Last-Modified', '')
+                            cache.setValidators(url, load_id, etag, last_modified)
+                        if not cache.addPage(url, load_id, page, content):
+                            cache = None
+                    except (OSError, sqlite3.Error) as ex:
+                        FrostProvider._logCacheError(ex)
+                        cache = None
                 
                 # get count
                 if callback:
-                    num_rows += len(read_rows)
                     callback(num_rows, total_rows)
+                    
+                yield read_rows
+            
+            # complete local cache
+            if cache is not None:
+                try:
+                    cache.finish(url, load_id, etag, last_modified, num_rows, max_id)
+                except (OSError, sqlite3.Error) as ex:
+                    FrostProvider._logCacheError(ex)
+        
+        finally:
+            if load_id is not None:
+                FrostLocationCache.end(url, load_id)
+    
+    @staticmethod
+    def _resumeUrl(url, num_rows):
+        """Returns the url of the rows of an url after the first ones"""
+        try:
+            top = int(QUrlQuery(QUrl(url).query()).queryItemValue('$top')) - num_rows
+        except ValueError:
+            top = 2147483647
+        return FrostProvider._windowUrl(url, num_rows, max(top, 0))
+    
+    @staticmethod
+    def _logCacheError(ex):
+        """Logs a local cache failure (data are loaded from the network)"""
+        QgsMessageLog.logMessage(
+            "{}: {}".format(
+                QCoreApplication.translate(__FROST_PROVIDER_NAME__, "Local cache not available, loading from the server"),
+                str(ex)),
+            __FROST_PROVIDER_NAME__, 
+            Qgis.Warning)
+    
+    @staticmethod
+    def requestData(url, callback=None, use_cache=True, revalidate=False):
+        """Load data from Frost server (or from the local cache)"""
+        
+        # init
+        rows = []
+        
+        try:
+            # loop all pages
+            for read_rows in FrostProvider.iterData(url, callback, use_cache, revalidate):
+                rows.extend(read_rows)
                 
             # return data
             return rows
@@ -392,6 +1618,52 @@ class FrostProvider(QgsVectorDataProvider):
         # return internal feature dict    
         return rows
 
+    @staticmethod
+    def appendRows(targets, stores, rows):
+        """Converts data rows into features of the store of each 
+           (converter, field count) target"""
+        # decode locations once for all the geometry types
+        decoded = [FrostRowConverter.decodeLocation(row) for row in rows] if len(targets) > 1 else None
+        for (converter, _), store in zip(targets, stores):
+            converter.appendRows(store, rows, decoded)
+    
+    @staticmethod
+    def loadStores(url, targets, callback=None, revalidate=False, is_canceled=None, on_page=None):
+        """Loads data of an url once, partitioned into a new feature store
+           for each (converter, field count) target (one per geometry type);
+           returns None if canceled; if on_page is set, the stores are 
+           progressive and on_page is called with them after each page"""
+        stores = [FrostFeatureStore(field_count, progressive=on_page is not None) for _, field_count in targets]
+        try:
+            # get data page by page, converting rows into stored features
+            for rows in FrostProvider.iterData(url, callback=callback, revalidate=revalidate):
+                if is_canceled is not None and is_canceled():
+                    return None
+                FrostProvider.appendRows(targets, stores, rows)
+                if on_page is not None:
+                    on_page(stores)
+            
+        except (UnicodeDecodeError, JSONDecodeError, ValueError) as ex:
+            QgsMessageLog.logMessage(str(ex), __FROST_PROVIDER_NAME__, Qgis.Critical)
+            QgsMessageLog.logMessage(traceback.format_exc(), __FROST_PROVIDER_NAME__, Qgis.Critical)
+        
+        return stores
+    
+    @staticmethod
+    def repaintInterval():
+        """Returns the minimum interval between repaints of a loading layer (ms)"""
+        try:
+            value = int(QgsSettings().value(f"{__FROST_PROVIDER_NAME__}/loading/repaintInterval", __FROST_DEFAULT_REPAINT_INTERVAL__))
+        except (TypeError, ValueError):
+            value = __FROST_DEFAULT_REPAINT_INTERVAL__
+        return max(value, 0)
+    
+    @staticmethod
+    def backgroundLoading():
+        """Returns true if layer data are loaded by a background task"""
+        value = QgsSettings().value(f"{__FROST_PROVIDER_NAME__}/loading/background", True)
+        return str(value).lower() not in ('false', '0', 'no')
+
     # Implementation of functions from QgsVectorDataProvider
     def __init__(self, uri, providerOptions=None, flags=None):
         """Constructor"""
@@ -413,6 +1685,30 @@ class FrostProvider(QgsVectorDataProvider):
             
             # remove provider geometry type parameter
             query.removeAllQueryItems(__FROST_PARAMETER_GEOM_TYPE__)
+        
+        # tiled lazy loading mode
+        self._tile_cache = None
+        self._tile_lock = threading.RLock()
+        # tiles being downloaded, tile cache version and too many tiles warning
+        self._tiles_loading = set()
+        self._tile_generation = 0
+        self._tiles_overflow = False
+        if query.hasQueryItem(__FROST_PARAMETER_TILE_SIZE__):
+            try:
+                tile_size = float(query.queryItemValue(__FROST_PARAMETER_TILE_SIZE__))
+            except ValueError:
+                tile_size = 0.0
+            if tile_size > 0.0:
+                s = QgsSettings()
+                self._tile_cache = FrostTileCache(
+                    tile_size,
+                    int(s.value(f"{__FROST_PROVIDER_NAME__}/tiles/maxTiles", __FROST_DEFAULT_MAX_TILES__)),
+                    int(s.value(f"{__FROST_PROVIDER_NAME__}/tiles/maxFeatures", __FROST_DEFAULT_MAX_TILE_FEATURES__)))
+            
+            # remove provider tile size parameter
+            query.removeAllQueryItems(__FROST_PARAMETER_TILE_SIZE__)
+        
+        if query.query() != QUrlQuery(src_url.query()).query():
             src_url.setQuery(query)
             self._uri = src_url.toString() # QUrl.EncodeSpaces ?
             
@@ -448,15 +1744,40 @@ class FrostProvider(QgsVectorDataProvider):
             QgsVectorDataProvider.NativeType(self.tr("Binary object (BLOB)"), "binary", QVariant.ByteArray)
         ])
         self._fields = fields
-        self._features = None
-        self._extent = QgsRectangle()
-        self._extent.setMinimal()
+        self._subset_selection = None
+        self._filter_selections = OrderedDict()
+        self._subset_lock = threading.RLock()
         self._subset_string = ''
+        self._pushdown_filter = ''
+        self._local_subset_string = ''
         
-        self._spatialindex = None
         self._provider_options = providerOptions
         self._flags = flags
         
+        # shared dataset (released with the provider)
+        self._handle = FrostDatasetHandle()
+        self.destroyed.connect(lambda *_, handle=self._handle: handle.release())
+        self._acquireDataset()
+        
+        # background loading
+        self._load_timer = None
+        self._repaint_timer = None
+        self._background = self._tile_cache is None and\
+                           FrostProvider.backgroundLoading() and\
+                           FrostProvider._isMainThread()
+        if self._background:
+            # start later, after the layer has set the subset string
+            self._load_timer = QTimer(self)
+            self._load_timer.setSingleShot(True)
+            self._load_timer.timeout.connect(self._startLoading)
+            self._load_timer.start(0)
+            
+            # throttled repaints while pages arrive
+            self._repaint_timer = QTimer(self)
+            self._repaint_timer.setSingleShot(True)
+            self._repaint_timer.setInterval(FrostProvider.repaintInterval())
+            self._repaint_timer.timeout.connect(self._repaintLayers)
+        
     def featureSource(self):
         """Returns feature source object"""
         return FrostFeatureSource(self)
@@ -478,15 +1799,63 @@ class FrostProvider(QgsVectorDataProvider):
         """Query the provider for features specified in request"""
         return FrostFeatureIterator(FrostFeatureIteratorImpl(FrostFeatureSource(self), request))
 
-    def uniqueValues(self, fieldIndex, limit=1):
+    def uniqueValues(self, fieldIndex, limit=-1):
+        """Returns the distinct values of a field (up to limit if not negative)"""
         results = set()
         if fieldIndex >= 0 and fieldIndex < self.fields().count():
-            req = QgsFeatureRequest()
-            req.setFlags(QgsFeatureRequest.NoGeometry)
-            req.setSubsetOfAttributes([fieldIndex])
-            for f in self.getFeatures(req):
-                results.add(f.attributes()[fieldIndex])
+            store = self.requestFeatures()
+            if not self.localSubsetString():
+                # fast way - distinct values of the attribute index
+                index = self.attributeIndex(fieldIndex, store)
+                if index is not None:
+                    return set(index.values(limit))
+                values = store.columns[fieldIndex][:len(store)]
+            else:
+                # memoized rows of the local subset
+                column = store.columns[fieldIndex]
+                values = (column[row] for row in self.subsetSelection(store).rows())
+            for value in values:
+                if 0 <= limit <= len(results):
+                    break
+                results.add(value)
         return results
+    
+    def minimumValue(self, index):
+        """Returns the minimum value of a field"""
+        return self._limitValue(index, False)
+    
+    def maximumValue(self, index):
+        """Returns the maximum value of a field"""
+        return self._limitValue(index, True)
+    
+    def _limitValue(self, fieldIndex, maximum):
+        """Returns the minimum or maximum not NULL value of a field"""
+        if fieldIndex < 0 or fieldIndex >= self.fields().count():
+            return QVariant()
+        store = self.requestFeatures()
+        if not self.localSubsetString():
+            index = self.attributeIndex(fieldIndex, store)
+            if index is not None:
+                value = index.maximum() if maximum else index.minimum()
+                return QVariant() if value is None else value
+            values = store.columns[fieldIndex][:len(store)]
+        else:
+            column = store.columns[fieldIndex]
+            values = (column[row] for row in self.subsetSelection(store).rows())
+        values = [value for value in values if value is not None]
+        if not values:
+            return QVariant()
+        limit = max if maximum else min
+        return limit(values, key=FrostAttributeIndex.sortKey)
+    
+    def attributeIndex(self, fieldIndex, store=None):
+        """Returns the attribute index of a field for the current features,
+           None if not available"""
+        if fieldIndex < 0 or fieldIndex >= self.fields().count():
+            return None
+        if store is None:
+            store = self.requestFeatures()
+        return self._handle.dataset.attributeIndex(fieldIndex, store)
 
     def wkbType(self):
         """Returns number of provided features"""
@@ -494,13 +1863,10 @@ class FrostProvider(QgsVectorDataProvider):
 
     def featureCount(self):
         """Returns number of provided features"""
-        if not self.subsetString():
+        if not self.localSubsetString():
             return len(self.requestFeatures())
         else:
-            req = QgsFeatureRequest()
-            req.setFlags(QgsFeatureRequest.NoGeometry)
-            req.setSubsetOfAttributes([])
-            return len([f for f in self.getFeatures(req)])
+            return self.subsetSelection().count
 
     def fields(self):
         """Returns fields list"""
@@ -509,57 +1875,226 @@ class FrostProvider(QgsVectorDataProvider):
     
         
     def requestFeatures(self, recreate: bool=False):
-        """Load feature from Frost server"""
+        """Load feature from Frost server into the feature store"""
+        dataset = self._handle.dataset
         
-        # init
-        if self._features is not None and not recreate:
-            return self._features
+        # tiled mode: features are loaded on demand by requestTiles
+        if self._tile_cache is not None:
+            with self._tile_lock:
+                if not dataset.loaded or recreate:
+                    self._tile_cache.clear()
+                    self._tile_generation += 1
+                    # progressive: rows of new tiles are appended unpublished
+                    dataset.setStore(FrostFeatureStore(self._fields.count(), progressive=True))
+                    dataset.loaded = True
+                return dataset.store
+        
+        # background mode: features are loaded by a task
+        if self._background:
+            if recreate:
+                self._startLoading(revalidate=True)
+            return dataset.store
+        
+        # load features now (if not already loaded by another provider)
+        if not dataset.loaded or recreate:
+            dataset.load(revalidate=recreate)
             
-        self._features = {}
+        # return internal feature store    
+        return dataset.store
+    
+    def spatialIndex(self):
+        """Returns the spatial index of the features, None if not created"""
+        return self._handle.dataset.spatialindex
+    
+    def _datasetKey(self):
+        """Returns the registry key of the provider data (None if private)"""
+        if self._tile_cache is not None:
+            return None
+        return FrostDatasetRegistry.normalizeKey(self._requestUrl(), int(self._wkbType), self._defWkbType)
+    
+    def _acquireDataset(self):
+        """Switches to the shared dataset of the current request url"""
+        old_dataset = self._handle.dataset
+        dataset = self._handle.acquire(
+            self._datasetKey(),
+            lambda: FrostDataset(
+                self._requestUrl(), self._wkbType, self._defWkbType, self._fields.count(),
+                FrostDatasetRegistry.normalizeKey(self._requestUrl()),
+                # rows of a connection match only the unfiltered source
+                None if self._pushdown_filter else FrostDatasetRegistry.normalizeKey(self._uri)))
+        if dataset is not old_dataset:
+            if old_dataset is not None:
+                try:
+                    old_dataset.dataPublished.disconnect(self._onDataPublished)
+                    old_dataset.loadingFinished.disconnect(self._onLoadingFinished)
+                except TypeError:
+                    pass
+            dataset.dataPublished.connect(self._onDataPublished)
+            dataset.loadingFinished.connect(self._onLoadingFinished)
+        return dataset
+    
+    def isLoading(self):
+        """Returns true while features are being loaded in background"""
+        if self._load_timer is not None and self._load_timer.isActive():
+            return True
+        return self._handle.dataset.loading
+    
+    def cancelLoading(self):
+        """Cancels the background loading of features"""
+        if self._load_timer is not None:
+            self._load_timer.stop()
+        self._handle.dataset.cancelLoading()
+    
+    def releaseDataset(self):
+        """Releases the shared dataset of a provider no more used, keeping 
+           an empty private one: the loading of the dataset is canceled only
+           if no other provider holds it"""
+        if self._load_timer is not None:
+            self._load_timer.stop()
+        old_dataset = self._handle.dataset
+        if old_dataset is not None:
+            try:
+                old_dataset.dataPublished.disconnect(self._onDataPublished)
+                old_dataset.loadingFinished.disconnect(self._onLoadingFinished)
+            except TypeError:
+                pass
+        dataset = FrostDataset(self._requestUrl(), self._wkbType, self._defWkbType, self._fields.count())
+        dataset.loaded = True
+        self._handle.acquire(None, lambda: dataset)
+    
+    def _startLoading(self, revalidate: bool=False):
+        """Starts loading features in a background task"""
+        if self._load_timer is not None:
+            self._load_timer.stop()
+        dataset = self._handle.dataset
+        if not FrostProvider._isMainThread():
+            # no event loop to get the task result: load now
+            dataset.load(revalidate=revalidate)
+            return
+        if dataset.loaded and not revalidate:
+            # already loaded by another provider
+            self.loadingFinished.emit(True)
+            return
+        dataset.startLoading(revalidate=revalidate)
         
+    def _onDataPublished(self):
+        """Updates the provider when new rows are visible"""
+        self.clearMinMaxCache()
         
-        try:
-            # get data
-            rows = FrostProvider.requestData(self._uri)
+        # throttled repaint
+        if self._repaint_timer is not None and not self._repaint_timer.isActive():
+            self._repaint_timer.start()
+    
+    def _repaintLayers(self):
+        """Signals a new extent and repaints the layers of the provider"""
+        self.fullExtentCalculated.emit()
+        for layer in QgsProject.instance().mapLayers().values():
+            if isinstance(layer, QgsVectorLayer) and layer.dataProvider() is self:
+                layer.triggerRepaint()
+    
+    def _onLoadingFinished(self, result):
+        """Updates the provider when the dataset is loaded"""
+        if self._repaint_timer is not None:
+            self._repaint_timer.stop()
+        if result:
+            self.updateExtents()
+            self.clearMinMaxCache()
+            self.dataChanged.emit()
+            self._repaintLayers()
+        self.loadingFinished.emit(result)
+    
+    def hasFeatures(self):
+        """Returns if the provider has features (maybe while loading)"""
+        if self.isLoading():
+            return QgsFeatureSource.FeaturesMaybeAvailable
+        return super().hasFeatures()
+    
+    def reloadProviderData(self):
+        """Reloads features from the Frost server"""
+        self.requestFeatures(recreate=True)
+    
+    def isTiled(self):
+        """Returns true if features are loaded on demand by map tiles"""
+        return self._tile_cache is not None
+    
+    def requestTiles(self, rect: QgsRectangle):
+        """Loads the missing tiles covering a rectangle (tiled mode);
+           tiles are downloaded without holding the tile lock and merged
+           into the feature store under it"""
+        if self._tile_cache is None or rect is None or rect.isNull():
+            return False
+        
+        with self._tile_lock:
+            cache = self._tile_cache
+            self.requestFeatures()
+            generation = self._tile_generation
             
-            # loop rows
-            for row in rows:
-                # get id
-                iot_id = row.get('@iot.id', None)
-                
-                #properties = row.get('properties', {})
+            # check tiles (counted before enumerating them)
+            if cache.tileCount(rect) > cache.maxTiles:
+                # too many tiles: load the ones nearest to the center only
+                if not self._tiles_overflow:
+                    self._tiles_overflow = True
+                    QgsMessageLog.logMessage(
+                        self.tr("Too many tiles requested; only locations near the center are loaded, zoom in to load all"),
+                        __FROST_PROVIDER_NAME__, 
+                        Qgis.Warning)
+            else:
+                self._tiles_overflow = False
+            keys = cache.tilesOf(rect, cache.maxTiles)
                 
-                # get location feature
-                feat_list = self._createFeature(iot_id, row)
-                if not feat_list:
-                    continue
-                    
-                # read attributes
-                attrs = []
-                attrs.append(self._quoteString(iot_id))
-                attrs.append(row.get('name', None))
-                attrs.append(row.get('description', None))
-                #attrs.append(properties.get('organization', None)) REMOVED
-                    
-                # create feature
-                for feat in feat_list:
-                    feat.setAttributes(attrs)
-                    feat.setId(self.next_feature_id)
-                    self._features[self.next_feature_id] = feat
-                    self.next_feature_id += 1
-            
-            
-            # create spatial index
-            self.createSpatialIndex()
+            # missing tiles not already being downloaded by another request
+            missing = [key for key in keys if not cache.contains(key) and key not in self._tiles_loading]
+            self._tiles_loading.update(missing)
+            urls = [self._tileUrl(cache.tileRect(key)) for key in missing]
+        
+        # download missing tiles
+        tiles = []
+        try:
+            for key, url in zip(missing, urls):
+                tiles.append((key, FrostProvider.requestData(url, use_cache=False)))
+        finally:
+            with self._tile_lock:
+                self._tiles_loading.difference_update(missing)
+        
+        with self._tile_lock:
+            dataset = self._handle.dataset
+            store = self.requestFeatures()
+            if generation != self._tile_generation:
+                # tiles reloaded meanwhile (e.g. new filter): discard downloaded rows
+                return False
             
-        except (UnicodeDecodeError, JSONDecodeError, ValueError) as ex:
-            QgsMessageLog.logMessage(str(ex), __FROST_PROVIDER_NAME__, Qgis.Critical)
-            QgsMessageLog.logMessage(traceback.format_exc(), __FROST_PROVIDER_NAME__, Qgis.Critical)
+            # merge downloaded tiles (appended rows are published below,
+            # readers of the shared store never see a partial row)
+            for key, rows in tiles:
+                if cache.contains(key):
+                    continue
+                feature_keys = [FrostRowConverter.quoteString(row.get('@iot.id', None)) for row in rows]
+                new_rows = [row for row, feature_key in zip(rows, feature_keys) if not cache.hasFeature(feature_key)]
+                dataset.converter.appendRows(store, new_rows)
+                cache.add(key, feature_keys)
+            cache.touch(keys)
             
-        # return internal feature dict    
-        return self._features
-    
-    
+            # release least recently used tiles
+            released = cache.evict(protected=keys)
+            if released:
+                self._compactStore()
+            else:
+                dataset.publish(store, store.appendedCount())
+                        
+            if tiles or released:
+                self.updateExtents()
+            return bool(tiles)
+        
+    def _compactStore(self):
+        """Rebuilds the feature store with features of loaded tiles only"""
+        dataset = self._handle.dataset
+        old_store = dataset.store
+        store = FrostFeatureStore(self._fields.count(), progressive=True)
+        for row in range(old_store.appendedCount()):
+            if self._tile_cache.hasFeature(old_store.columns[0][row]):
+                store.appendFrom(old_store, row)
+        store.publish(store.appendedCount())
+        dataset.setStore(store)
     
     def addFeatures(self, flist, flags=None):
         """Add new feature method"""
@@ -591,7 +2126,8 @@ class FrostProvider(QgsVectorDataProvider):
         
     def allFeatureIds(self):
         """Returns id list of all provided features"""
-        return list(self.requestFeatures().keys())
+        store = self.requestFeatures()
+        return list(store.fids[:len(store)])
 
     def subsetString(self):
         """Returns the subset definition string currently in use by 
@@ -603,26 +2139,50 @@ class FrostProvider(QgsVectorDataProvider):
         if subsetString == self._subset_string:
             return True
         self._subset_string = subsetString
+        with self._subset_lock:
+            self._subset_selection = None
+        
+        # split subset string into server side filter and local expression
+        pushdown_filter, self._local_subset_string = FrostFilterTranslator.translate(subsetString)
+        if pushdown_filter != self._pushdown_filter:
+            # reload features with the new server side filter
+            self._pushdown_filter = pushdown_filter
+            with self._tile_lock:
+                if self._tile_cache is not None:
+                    self._handle.dataset.loaded = False
+                else:
+                    # share the dataset of the new request url
+                    self._acquireDataset()
+                    if self._background and not self._load_timer.isActive():
+                        self._startLoading()
+        
         self.updateExtents()
         self.clearMinMaxCache()
         self.dataChanged.emit()
         return True
 
+    def localSubsetString(self):
+        """Returns the part of the subset string evaluated by the provider,
+           not translatable as a server side filter"""
+        return self._local_subset_string
+
     def supportsSubsetString(self):
         """Returnsif the provider supports setting of subset strings"""
         return True
 
     def createSpatialIndex(self):
         """Creates spatial index for requested featurs"""
-        if self._spatialindex is None:
-            self._spatialindex = QgsSpatialIndex()
-            for f in self.requestFeatures().values():
-                self._spatialindex.addFeature(f)
+        self.requestFeatures()
+        self._handle.dataset.createSpatialIndex()
         return True
 
+    def createAttributeIndex(self, field):
+        """Creates the attribute index of a field"""
+        return self.attributeIndex(field) is not None
+
     def capabilities(self):
         """Returns flags containing the supported capabilities"""
-        return QgsVectorDataProvider.CreateSpatialIndex | QgsVectorDataProvider.SelectAtId | QgsVectorDataProvider.CircularGeometries
+        return QgsVectorDataProvider.CreateSpatialIndex | QgsVectorDataProvider.CreateAttributeIndex | QgsVectorDataProvider.SelectAtId | QgsVectorDataProvider.CircularGeometries
         #return QgsVectorDataProvider.AddFeatures | QgsVectorDataProvider.DeleteFeatures | QgsVectorDataProvider.CreateSpatialIndex | QgsVectorDataProvider.ChangeGeometries | QgsVectorDataProvider.ChangeAttributeValues | QgsVectorDataProvider.AddAttributes | QgsVectorDataProvider.DeleteAttributes | QgsVectorDataProvider.RenameAttributes | QgsVectorDataProvider.SelectAtId | QgsVectorDataProvider. CircularGeometries
         
 
@@ -636,26 +2196,83 @@ class FrostProvider(QgsVectorDataProvider):
 
     def extent(self):
         """Returns the extent of all providedfeatures"""
-        if self._extent.isEmpty() and self.requestFeatures():
-            self._extent.setMinimal()
-            if not self._subset_string:
-                # fast way - iterate through all features
-                for feat in self.requestFeatures().values():
-                    if feat.hasGeometry():
-                        self._extent.combineExtentWith(feat.geometry().boundingBox())
-            else:
-                for f in self.getFeatures(QgsFeatureRequest().setSubsetOfAttributes([])):
-                    if f.hasGeometry():
-                        self._extent.combineExtentWith(f.geometry().boundingBox())
-
-        elif not self.requestFeatures():
-            self._extent.setMinimal()
-            
-        return QgsRectangle(self._extent)
+        store = self.requestFeatures()
+        if self.isTiled() and not len(store):
+            # tiled mode: data could be anywhere
+            return QgsRectangle(FrostTileCache.GRID_EXTENT)
+        if not self._local_subset_string:
+            # fast way - shared extent of the stored bounding boxes
+            return self._handle.dataset.extent()
+        return self.subsetSelection(store).extent()
 
     def updateExtents(self):
         """Update the extent of all provided features"""
-        self._extent.setMinimal()
+        # extents are memoized per subset and data version
+        pass
+    
+    def subsetSelection(self, store=None):
+        """Returns the rows of the store matching the local subset 
+           expression, computed once per subset and data version"""
+        if store is None:
+            store = self.requestFeatures()
+        subset_string = self._local_subset_string
+        with self._subset_lock:
+            selection = self._subset_selection
+            if selection is None or not selection.matches(store, subset_string):
+                selection = FrostStoreSelection(store, self._selectSubset(subset_string, store), subset_string)
+                self._subset_selection = selection
+            return selection
+    
+    def filterSelection(self, expression, store):
+        """Returns the rows of the store matching a filter expression,
+           computed once per expression and data version (the most recently
+           used ones are kept); None if the expression is not compilable"""
+        key = expression.expression()
+        with self._subset_lock:
+            selection = self._filter_selections.get(key)
+            if selection is not None and selection.matches(store, key):
+                self._filter_selections.move_to_end(key)
+                return selection
+
+        predicate = FrostPredicateCompiler.compile(expression, self._fields)
+        bitmap = predicate.select(
+            store, lambda field_index: self.attributeIndex(field_index, store)
+        ) if predicate is not None else None
+        if bitmap is None:
+            return None
+
+        selection = FrostStoreSelection(store, bitmap, key)
+        with self._subset_lock:
+            self._filter_selections[key] = selection
+            self._filter_selections.move_to_end(key)
+            while len(self._filter_selections) > __FROST_MAX_FILTER_SELECTIONS__:
+                self._filter_selections.popitem(last=False)
+        return selection
+
+    def _selectSubset(self, subset_string, store):
+        """Returns the bitmap of the store rows matching a subset expression"""
+        if not subset_string:
+            return b'\x01' * len(store)
+        predicate = FrostPredicateCompiler.compile(subset_string, self._fields)
+        bitmap = predicate.select(
+            store, lambda field_index: self.attributeIndex(field_index, store)
+        ) if predicate is not None else None
+        if bitmap is not None:
+            return bitmap
+        
+        # not compilable: evaluate the expression feature by feature
+        context = QgsExpressionContext()
+        context.appendScope(QgsExpressionContextUtils.globalScope())
+        context.appendScope(QgsExpressionContextUtils.projectScope(QgsProject.instance()))
+        context.setFields(self._fields)
+        expression = QgsExpression(subset_string)
+        expression.prepare(context)
+        bitmap = bytearray(len(store))
+        for row in range(len(bitmap)):
+            context.setFeature(store.feature(row, self._fields))
+            if expression.evaluate(context):
+                bitmap[row] = 1
+        return bytes(bitmap)
 
     def isValid(self):
         """Returns if valid provider"""
@@ -668,48 +2285,53 @@ class FrostProvider(QgsVectorDataProvider):
     def handlePostCloneOperations(self, source):
         """Handles any post-clone operations required after this 
            vector data provider was cloned from the source provider"""
-        self._features = source.requestProviderFeatures()
+        if isinstance(source, FrostProvider):
+            # same subset: share the source dataset
+            self.setSubsetString(source.subsetString(), False)
         
         
-    def _quoteString(self, value):
-        """Quote a string with single quotation"""
-        return f"'{value}'" if isinstance(value, str) else value
+    def _requestUrl(self):
+        """Returns the data url with the server side subset filter
+           and the selection of stored columns"""
+        url = QUrl(self._uri)
+        query = QUrlQuery(url.query())
+        if self._pushdown_filter:
+            filter_param = self._pushdown_filter
+            if query.hasQueryItem('$filter'):
+                filter_param = "({}) and ({})".format(query.queryItemValue('$filter'), filter_param)
+            query.removeAllQueryItems('$filter')
+            query.addQueryItem('$filter', filter_param)
+        select_param = self._selectParam()
+        if select_param and not query.hasQueryItem('$select') and not query.hasQueryItem('$expand'):
+            query.addQueryItem('$select', select_param)
+        url.setQuery(query)
+        return url.toString()
     
-    def _createFeature(self, iot_id, row):
-        """ """
-        try:
-            # try to create feature from json
-            json_location = row.get('location', {})
-            json_geom = json.dumps(json_location)
-            feat_list = QgsJsonUtils.stringToFeatureList(json_geom)
-            
-            # filter feature
-            res_feat_list = []
-            for feat in feat_list:
-                # check if valid geometry
-                geom = feat.geometry()
-                if geom.wkbType() == self._wkbType:
-                    res_feat_list.append(feat)
-                    
-                elif self._defWkbType:
-                    # log message
-                    geom_type = QgsWkbTypes.displayString(geom.wkbType())
-                    QgsMessageLog.logMessage(
-                        "{} (@iot.id: {}): {}".format(
-                            self.tr("Geometry type not allowed"), iot_id, geom_type),
-                        __FROST_PROVIDER_NAME__, 
-                        Qgis.Warning)
-            
-            # return list of features
-            return res_feat_list
-            
-        except Exception as ex:
-            # emit log
-            QgsMessageLog.logMessage(
-                "{} (@iot.id: {}): {}".format(self.tr("Skipped invalid location"), iot_id, str(ex)),
-                __FROST_PROVIDER_NAME__, 
-                Qgis.Warning)
-            return [] 
+    def _selectParam(self):
+        """Returns the $select parameter of the stored columns, 
+           empty if disabled in settings"""
+        value = QgsSettings().value(f"{__FROST_PROVIDER_NAME__}/paging/select", True)
+        if str(value).lower() in ('false', '0', 'no'):
+            return ''
+        paths = [
+            FrostFilterTranslator.FIELD_PATHS[field.name()]
+            for field in self._fields
+            if field.name() in FrostFilterTranslator.FIELD_PATHS
+        ]
+        paths.append(__FROST_SELECT_LOCATION__)
+        return ','.join(paths)
+    
+    def _tileUrl(self, rect: QgsRectangle):
+        """Returns the data url filtered by a tile rectangle"""
+        url = QUrl(self._requestUrl())
+        query = QUrlQuery(url.query())
+        filter_param = f"st_intersects(location, geography'{rect.asWktPolygon()}')"
+        if query.hasQueryItem('$filter'):
+            filter_param = "({}) and {}".format(query.queryItemValue('$filter'), filter_param)
+        query.removeAllQueryItems('$filter')
+        query.addQueryItem('$filter', filter_param)
+        url.setQuery(query)
+        return url.toString()
     
     """        
     def _createFeature(self, iot_id, row):
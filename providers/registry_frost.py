@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+"""SensorThings API Plugin
+
+Description
+-----------
+
+Process-wide registry of datasets shared by Frost providers.
+
+Libraries/Modules
+-----------------
+
+- None.
+
+Notes
+-----
+
+- Providers of the same normalized source (cloned providers, duplicated
+  layers, layers added twice) share one reference counted dataset.
+- A dataset is closed and dropped when its last provider releases it.
+
+
+Author(s)
+---------
+
+- Created by the SensorThingsAPI plugin contributors on 18/10/2026,
+  as part of the Frost provider performance work.
+
+Members
+-------
+"""
+import threading
+
+from qgis.PyQt.QtCore import QUrl, QUrlQuery
+
+
+#
+#-----------------------------------------------------------
+class FrostDatasetRegistry:
+    """Reference counted registry of shared datasets"""
+
+    _lock = threading.RLock()
+    # key => [dataset, number of references]
+    _datasets = {}
+
+    @staticmethod
+    def normalizeKey(url: str, *parts) -> str:
+        """Returns a registry key for an url (query items sorted and
+           fully decoded) and further discriminating parts"""
+        qurl = QUrl(url)
+        query = QUrlQuery(qurl.query())
+        items = sorted(query.queryItems(QUrl.FullyDecoded))
+        base = "{}://{}{}{}".format(
+            qurl.scheme().lower(),
+            qurl.host().lower(),
+            f":{qurl.port()}" if qurl.port() != -1 else '',
+            qurl.path(QUrl.FullyDecoded).rstrip('/'))
+        key = base + '?' + '&'.join(f"{name}={value}" for name, value in items)
+        if parts:
+            key += '#' + '|'.join(str(part) for part in parts)
+        return key
+
+    @classmethod
+    def acquire(cls, key: str, factory):
+        """Returns the dataset of a key (created by factory if missing)
+           and adds a reference to it"""
+        with cls._lock:
+            rec = cls._datasets.get(key)
+            if rec is None:
+                rec = [factory(), 0]
+                cls._datasets[key] = rec
+            rec[1] += 1
+            return rec[0]
+
+    @classmethod
+    def release(cls, key: str, dataset):
+        """Removes a reference to a dataset, closing it if unused"""
+        with cls._lock:
+            rec = cls._datasets.get(key)
+            if rec is None or rec[0] is not dataset:
+                return
+            rec[1] -= 1
+            if rec[1] > 0:
+                return
+            del cls._datasets[key]
+        dataset.close()
+
+    @classmethod
+    def datasets(cls) -> list:
+        """Returns the registered datasets"""
+        with cls._lock:
+            return [rec[0] for rec in cls._datasets.values()]
+
+#
+#-----------------------------------------------------------
+class FrostDatasetHandle:
+    """Reference of a provider to a registered dataset"""
+
+    def __init__(self):
+        """Constructor"""
+        self.key = None
+        self.dataset = None
+
+    def acquire(self, key: str, factory):
+        """Switches to the dataset of a key"""
+        if self.dataset is not None and key == self.key:
+            return self.dataset
+        dataset = factory() if key is None else FrostDatasetRegistry.acquire(key, factory)
+        self.release()
+        self.key = key
+        self.dataset = dataset
+        return dataset
+
+    def release(self):
+        """Releases the current dataset"""
+        key, dataset = self.key, self.dataset
+        self.key = self.dataset = None
+        if dataset is None:
+            return
+        if key is None:
+            # private dataset
+            dataset.close()
+        else:
+            FrostDatasetRegistry.release(key, dataset)
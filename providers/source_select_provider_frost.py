@@ -47,9 +47,10 @@ from qgis.core import (Qgis,
 
 from qgis.PyQt import uic
 from qgis.PyQt.QtGui import QIcon
-from qgis.PyQt.QtCore import pyqtSignal, Qt, QEventLoop, QTimer, QUrl, QUrlQuery
+from qgis.PyQt.QtCore import pyqtSignal, Qt, QObject, QEventLoop, QTimer, QUrl, QUrlQuery
 from qgis.PyQt.QtGui import QStandardItemModel, QStandardItem
-from qgis.PyQt.QtWidgets import QAction, QMessageBox, QDialog, QMenu, QToolButton
+from qgis.PyQt.QtWidgets import (QAction, QMessageBox, QDialog, QMenu, QToolButton,
+                                 QProgressBar, QPushButton)
 
 from SensorThingsAPI.providers.provider_frost import (__FROST_PROVIDER_NAME__, 
                                                       __FROST_DEFAULT_GEOM_TYPE__,
@@ -60,6 +61,163 @@ from SensorThingsAPI.providers.connection_frost_dlg import FrostConnectionDialog
 
 FORM_CLASS, _ = uic.loadUiType(os.path.join(
     os.path.dirname(__file__), 'ui/datasource_dialog.ui'))
+
+#: Constant for default number of groups loaded at the same time by Add all
+__FROST_DEFAULT_ADD_ALL_CONCURRENCY__ = 4
+ 
+# 
+#-----------------------------------------------------------
+class FrostAddAllJob(QObject):
+    """Adds the layers of many location groups, loading a bounded
+       number of groups at a time"""
+    
+    def __init__(self, widget, groups, group_name):
+        """Constructor: groups is a list of (name, url)"""
+        super().__init__(iface.mainWindow())
+        self._widget = widget
+        self._groups = list(groups)
+        self._total = len(self._groups)
+        self._done = 0
+        self._canceled = False
+        self._finished = False
+        # layer => (provider loading finished slot, drop if empty)
+        self._pending = {}
+        self._pending_groups = {}
+        self._max_pending = FrostAddAllJob.concurrency()
+        
+        # layer tree group
+        root = QgsProject.instance().layerTreeRoot()
+        self._tree_group = root.insertGroup(0, group_name)
+        
+        # progress message with cancel button
+        self._message = iface.messageBar().createMessage(widget._messages.get('Loading'), '')
+        self._progress = QProgressBar()
+        self._progress.setRange(0, max(self._total, 1))
+        self._progress.setValue(0)
+        self._message.layout().addWidget(self._progress)
+        button = QPushButton(widget.tr("Cancel"))
+        button.clicked.connect(self.cancel)
+        self._message.layout().addWidget(button)
+        
+    @staticmethod
+    def concurrency():
+        """Returns the number of groups loaded at the same time"""
+        try:
+            value = int(QgsSettings().value(
+                f"{__FROST_PROVIDER_NAME__}/loading/addAllConcurrency", __FROST_DEFAULT_ADD_ALL_CONCURRENCY__))
+        except (TypeError, ValueError):
+            value = __FROST_DEFAULT_ADD_ALL_CONCURRENCY__
+        return max(value, 1)
+        
+    def start(self):
+        """Starts adding the layers"""
+        iface.messageBar().clearWidgets()
+        iface.messageBar().pushWidget(self._message, Qgis.Info)
+        QTimer.singleShot(0, self._next)
+    
+    def cancel(self):
+        """Stops adding layers, dropping the layers still loading
+           (their data are still loaded if shared by other layers)"""
+        self._canceled = True
+        self._groups = []
+        for layer, (slot, _) in list(self._pending.items()):
+            provider = layer.dataProvider()
+            try:
+                provider.loadingFinished.disconnect(slot)
+            except TypeError:
+                pass
+            provider.releaseDataset()
+        self._pending = {}
+        self._pending_groups = {}
+        self._finish()
+    
+    def _next(self):
+        """Creates the layers of the next groups (up to the maximum
+           number of groups loading)"""
+        if self._finished:
+            return
+        while self._groups and not self._canceled and len(self._pending_groups) < self._max_pending:
+            grp_name, grp_url = self._groups.pop(0)
+            self._updateProgress(grp_name)
+            layers = []
+            for layer, drop_if_empty in self._widget._newLayers(grp_url, grp_name):
+                provider = layer.dataProvider()
+                if provider.isLoading():
+                    # add the layer when loaded (out of the provider signal)
+                    slot = lambda _, layer=layer: QTimer.singleShot(0, lambda: self._onLayerLoaded(layer))
+                    provider.loadingFinished.connect(slot)
+                    self._pending[layer] = (slot, drop_if_empty)
+                    layers.append(layer)
+                else:
+                    self._addLayer(layer, drop_if_empty)
+            if layers:
+                self._pending_groups[grp_name] = layers
+            else:
+                # loaded synchronously: let the user interface update
+                self._done += 1
+                break
+            
+        self._updateProgress()
+        if not self._groups and not self._pending_groups:
+            self._finish()
+        elif self._groups and len(self._pending_groups) < self._max_pending:
+            QTimer.singleShot(0, self._next)
+    
+    def _onLayerLoaded(self, layer):
+        """Adds a loaded layer and schedules the next groups"""
+        rec = self._pending.pop(layer, None)
+        if rec is None:
+            # canceled
+            return
+        slot, drop_if_empty = rec
+        try:
+            layer.dataProvider().loadingFinished.disconnect(slot)
+        except TypeError:
+            pass
+        self._addLayer(layer, drop_if_empty)
+        
+        # check if group completed
+        for grp_name, layers in list(self._pending_groups.items()):
+            if layer in layers:
+                layers.remove(layer)
+                if not layers:
+                    del self._pending_groups[grp_name]
+                    self._done += 1
+                break
+        self._next()
+    
+    def _addLayer(self, layer, drop_if_empty):
+        """Adds a layer to the layer tree group (if not empty when allowed)"""
+        if not layer.isValid() or (
+                drop_if_empty and layer.hasFeatures() == QgsFeatureSource.NoFeaturesAvailable):
+            return
+        QgsProject.instance().addMapLayer(layer, False)
+        self._tree_group.addLayer(layer)
+        self._widget._applyLayerStyle(layer)
+    
+    def _updateProgress(self, grp_name=None):
+        """Shows the aggregate progress"""
+        self._progress.setValue(self._done)
+        text = "{}/{}".format(self._done, self._total)
+        if grp_name:
+            text = "{} ({} ...)".format(text, grp_name)
+        self._message.setText(text)
+    
+    def _finish(self):
+        """Shows the result and releases the job"""
+        if self._finished:
+            return
+        self._finished = True
+        if self._tree_group is not None and not self._tree_group.children():
+            QgsProject.instance().layerTreeRoot().removeChildNode(self._tree_group)
+        self._tree_group = None
+        
+        iface.messageBar().clearWidgets()
+        if not self._canceled:
+            iface.messageBar().pushMessage('', self._widget._messages.get('Loaded'), Qgis.Success, 2)
+        iface.mapCanvas().refreshAllLayers()
+        self._widget._add_all_job = None
+        self.deleteLater()
  
 # 
 #-----------------------------------------------------------
@@ -99,6 +257,7 @@ class FrostDataSourceWidget(QgsAbstractDataSourceWidget, FORM_CLASS):
         self._geomfilter = {}
         self._menuFilterProperties = None
         self._menuFilterGeometries = None
+        self._add_all_job = None
         
         # messages
         self._messages = {
@@ -418,47 +577,28 @@ class FrostDataSourceWidget(QgsAbstractDataSourceWidget, FORM_CLASS):
     
     def onAddAll(self):
         """Add new layer slot"""
-         
-        try:
-            # show message
-            self._showProgressbar(
-                "{} ...".format(self._messages.get('Loading')), '', Qgis.Info, wait_cursor=True)
-            
-            # close dialog
-            self.onClose()
+        if self._add_all_job is not None:
+            # already adding layers
+            return
         
-            # loop table items
-            model = self.tblLayes.model()
-            for row in range(model.rowCount()):
-                index = model.index(row, 0)
-                
-                # get location group data
-                grp_data = model.data(index, Qt.UserRole)
-                if not grp_data:
-                    continue
-                grp_name = grp_data.get('name', 'unknown')
-                grp_url = grp_data.get('url', '')
-                
-                # show message
-                self._showProgressbar(
-                    "{} {} ...".format(self._messages.get('Loading'), grp_name), '', Qgis.Info, wait_cursor=True)
-                
-                # create new layer
-                self._createLayer(grp_url, grp_name)
-                
-                #
-                self._removeProgressbar()
-                QgsApplication.processEvents(QEventLoop.ExcludeUserInputEvents)
-            
-        finally:
-            # show result
-            self._removeProgressbar()
+        # collect table items
+        groups = []
+        model = self.tblLayes.model()
+        for row in range(model.rowCount()):
+            index = model.index(row, 0)
             
-            QTimer.singleShot(500, lambda self=self: self._showProgressbar(
-                self._messages.get('Loaded'), '', Qgis.Success, duration=2))
-            
-            # repaint canvas
-            QTimer.singleShot(500, lambda: iface.mapCanvas().refreshAllLayers())
+            # get location group data
+            grp_data = model.data(index, Qt.UserRole)
+            if not grp_data:
+                continue
+            groups.append((grp_data.get('name', 'unknown'), grp_data.get('url', '')))
+        
+        # close dialog
+        self.onClose()
+        
+        # add layers in background, in a layer tree group
+        self._add_all_job = FrostAddAllJob(self, groups, self.cmbConnection.currentText())
+        self._add_all_job.start()
             
     
     def _showConnection(self, num, count):
@@ -620,7 +760,27 @@ class FrostDataSourceWidget(QgsAbstractDataSourceWidget, FORM_CLASS):
         
     def _createLayer(self, url, lay_name):
         """Creates new layer"""
+        for layer, drop_if_empty in self._newLayers(url, lay_name):
+            if drop_if_empty:
+                provider = layer.dataProvider()
+                if provider.isLoading():
+                    # check again when loaded (out of the provider signal)
+                    provider.loadingFinished.connect(
+                        lambda _, layer_id=layer.id(): QTimer.singleShot(
+                            0, lambda: FrostDataSourceWidget._removeEmptyLayer(layer_id)))
+            
+            # add the layer to the Layers panel
+            QgsProject.instance().addMapLayer(layer) 
+            
+            # set layer style
+            self._applyLayerStyle(layer)
+        
+    def _newLayers(self, url, lay_name):
+        """Returns the new layers of a location group (one for each
+           checked geometry type), not yet added to the project, with
+           a flag to drop them if empty after loading"""
         # init
+        layers = []
         geom_type_list = []
         def_geom_type = QgsWkbTypes.displayString(__FROST_DEFAULT_GEOM_TYPE__)
         
@@ -647,14 +807,10 @@ class FrostDataSourceWidget(QgsAbstractDataSourceWidget, FORM_CLASS):
                 # check if empty
                 if layer.hasFeatures() == QgsFeatureSource.NoFeaturesAvailable:
                     continue
+                layers.append((layer, True))
             else:
                 layer = QgsVectorLayer(url_with_geom.toString(), lay_name, 'frost')
-            
-            # add the layer to the Layers panel
-            QgsProject.instance().addMapLayer(layer) 
-            
-            # set layer style
-            self._applyLayerStyle(layer)
+                layers.append((layer, False))
             
             # log message
             QgsMessageLog.logMessage(
@@ -662,6 +818,16 @@ class FrostDataSourceWidget(QgsAbstractDataSourceWidget, FORM_CLASS):
                 __FROST_PROVIDER_NAME__,
                 Qgis.Info)
         
+        return layers
+        
+    @staticmethod
+    def _removeEmptyLayer(layer_id):
+        """Removes a layer without features"""
+        project = QgsProject.instance()
+        layer = project.mapLayer(layer_id)
+        if layer is not None and layer.hasFeatures() == QgsFeatureSource.NoFeaturesAvailable:
+            project.removeMapLayer(layer_id)
+        
     def _applyLayerStyle(self, layer):
         """Apply style to Frost layer"""
         return
@@ -0,0 +1,279 @@
+# -*- coding: utf-8 -*-
+"""SensorThings API Plugin
+
+Description
+-----------
+
+Columnar feature store for the Frost Provider.
+
+Libraries/Modules
+-----------------
+
+- None.
+
+Notes
+-----
+
+- Features are kept as parallel columns (attribute lists, WKB blobs
+  and bounding box arrays); QgsFeature objects are only created on request.
+- A progressive store is filled by a loader thread while readers only see
+  the rows published so far.
+- A selection keeps the rows of a store version (store and number of
+  published rows) matching a filter, with their count and extent.
+- An attribute index maps the values of a column of a store version
+  to their rows, with the sorted distinct values.
+
+
+Author(s)
+---------
+
+- Created by the SensorThingsAPI plugin contributors on 18/10/2026,
+  as part of the Frost provider performance work.
+
+Members
+-------
+"""
+from array import array
+from itertools import compress
+
+from qgis.core import QgsFeature, QgsGeometry, QgsRectangle
+
+
+#
+#-----------------------------------------------------------
+class FrostFeatureStore:
+    """Array backed store of Frost provider features"""
+
+    def __init__(self, field_count: int, progressive: bool=False):
+        """Constructor"""
+        # feature ids
+        self.fids = array('q')
+        # attribute columns
+        self.columns = [[] for _ in range(field_count)]
+        # geometries as WKB blobs (None if no geometry)
+        self.wkbs = []
+        # bounding boxes
+        self.xmin = array('d')
+        self.ymin = array('d')
+        self.xmax = array('d')
+        self.ymax = array('d')
+        # feature id => row index
+        self._rows = {}
+        # number of rows visible to readers (None: all rows)
+        self._published = 0 if progressive else None
+
+    def __len__(self):
+        """Returns number of stored (published) features"""
+        if self._published is None:
+            return len(self.fids)
+        return self._published
+
+    def appendedCount(self) -> int:
+        """Returns number of appended features, published or not"""
+        return len(self.fids)
+
+    def isProgressive(self) -> bool:
+        """Returns true if some appended rows could be not yet published"""
+        return self._published is not None
+
+    def publish(self, count: int=None):
+        """Makes the first rows visible to readers (all rows if count is None)"""
+        if count is None:
+            self._published = None
+        elif self._published is not None:
+            self._published = max(self._published, min(int(count), len(self.fids)))
+
+    def append(self, fid: int, attrs: list, geometry: QgsGeometry=None):
+        """Appends a feature row"""
+        if geometry is None or geometry.isNull():
+            return self.appendWkb(fid, attrs, None)
+        bbox = geometry.boundingBox()
+        return self.appendWkb(
+            fid, attrs, bytes(geometry.asWkb()),
+            bbox.xMinimum(), bbox.yMinimum(), bbox.xMaximum(), bbox.yMaximum())
+
+    def appendWkb(self, fid: int, attrs: list, wkb: bytes, xmin=0.0, ymin=0.0, xmax=-1.0, ymax=-1.0):
+        """Appends a feature row from a WKB blob and its bounding box"""
+        row = len(self.fids)
+        self.fids.append(fid)
+        self._rows[fid] = row
+
+        # attributes
+        for index, column in enumerate(self.columns):
+            column.append(attrs[index] if index < len(attrs) else None)
+
+        # geometry
+        if wkb is None:
+            xmin, ymin, xmax, ymax = 0.0, 0.0, -1.0, -1.0
+        self.wkbs.append(wkb)
+        self.xmin.append(xmin)
+        self.ymin.append(ymin)
+        self.xmax.append(xmax)
+        self.ymax.append(ymax)
+        return row
+
+    def appendFrom(self, store, row: int):
+        """Appends a copy of a row of another store"""
+        return self.appendWkb(
+            store.fids[row], store.attributes(row), store.wkbs[row],
+            store.xmin[row], store.ymin[row], store.xmax[row], store.ymax[row])
+
+    def rowOf(self, fid: int):
+        """Returns the row index of a feature id, None if not found"""
+        row = self._rows.get(fid)
+        if row is None or row >= len(self):
+            return None
+        return row
+
+    def hasGeometry(self, row: int) -> bool:
+        """Returns true if the row has a geometry"""
+        return self.wkbs[row] is not None
+
+    def boundingBox(self, row: int) -> QgsRectangle:
+        """Returns the bounding box of a row geometry"""
+        return QgsRectangle(self.xmin[row], self.ymin[row], self.xmax[row], self.ymax[row])
+
+    def bboxIntersects(self, row: int, rect: QgsRectangle) -> bool:
+        """Returns true if the row bounding box intersects a rectangle"""
+        if self.wkbs[row] is None:
+            return False
+        return not (self.xmin[row] > rect.xMaximum() or self.xmax[row] < rect.xMinimum() or
+                    self.ymin[row] > rect.yMaximum() or self.ymax[row] < rect.yMinimum())
+
+    def geometry(self, row: int) -> QgsGeometry:
+        """Returns a new geometry for a row"""
+        geom = QgsGeometry()
+        wkb = self.wkbs[row]
+        if wkb is not None:
+            geom.fromWkb(wkb)
+        return geom
+
+    def attributes(self, row: int) -> list:
+        """Returns the attribute values of a row"""
+        return [column[row] for column in self.columns]
+
+    def feature(self, row: int, fields) -> QgsFeature:
+        """Creates a new feature from a row"""
+        feat = QgsFeature(fields)
+        feat.setId(self.fids[row])
+        feat.setAttributes(self.attributes(row))
+        if self.wkbs[row] is not None:
+            feat.setGeometry(self.geometry(row))
+        feat.setValid(True)
+        return feat
+
+    def extent(self, rows=None) -> QgsRectangle:
+        """Returns the extent of stored features (or of a subset of rows)"""
+        rect = QgsRectangle()
+        rect.setMinimal()
+        rows = range(len(self)) if rows is None else rows
+
+        xmin = ymin = float('inf')
+        xmax = ymax = float('-inf')
+        found = False
+        for row in rows:
+            if self.wkbs[row] is None:
+                continue
+            found = True
+            xmin = min(xmin, self.xmin[row])
+            ymin = min(ymin, self.ymin[row])
+            xmax = max(xmax, self.xmax[row])
+            ymax = max(ymax, self.ymax[row])
+
+        if found:
+            rect = QgsRectangle(xmin, ymin, xmax, ymax)
+        return rect
+
+#
+#-----------------------------------------------------------
+class FrostStoreSelection:
+    """Rows of a store version selected by a bitmap"""
+
+    def __init__(self, store: FrostFeatureStore, bitmap: bytes, key=None):
+        """Constructor: bitmap has one byte per published row, 1 if selected"""
+        self.store = store
+        self.key = key
+        self.bitmap = bitmap
+        self.size = len(bitmap)
+        self.count = bitmap.count(1)
+        self._rows = None
+        self._extent = None
+
+    def matches(self, store: FrostFeatureStore, key=None) -> bool:
+        """Returns true if the selection is of the current version of a store"""
+        return store is self.store and key == self.key and len(store) == self.size
+
+    def rows(self) -> list:
+        """Returns the selected row indexes"""
+        if self._rows is None:
+            self._rows = list(compress(range(self.size), self.bitmap))
+        return self._rows
+
+    def extent(self) -> QgsRectangle:
+        """Returns the extent of the selected rows"""
+        if self._extent is None:
+            self._extent = self.store.extent(self.rows())
+        return QgsRectangle(self._extent)
+
+#
+#-----------------------------------------------------------
+class FrostAttributeIndex:
+    """Value index of a column of a store version"""
+
+    def __init__(self, store: FrostFeatureStore, field_index: int):
+        """Constructor"""
+        self.store = store
+        self.field_index = field_index
+        self.size = len(store)
+        # value => rows (ascending)
+        self._rows = {}
+        for row, value in enumerate(store.columns[field_index][:self.size]):
+            rows = self._rows.get(value)
+            if rows is None:
+                self._rows[value] = [row]
+            else:
+                rows.append(row)
+        self._sorted = None
+
+    @staticmethod
+    def sortKey(value):
+        """Returns the sort key of a value (numbers before strings)"""
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return (0, value, '')
+        return (1, 0, str(value))
+
+    def matches(self, store: FrostFeatureStore) -> bool:
+        """Returns true if the index is of the current version of a store"""
+        return store is self.store and len(store) == self.size
+
+    def rowsOf(self, value) -> list:
+        """Returns the rows of a value"""
+        return self._rows.get(value, [])
+
+    def values(self, limit: int=-1) -> list:
+        """Returns the distinct values (NULL included), up to a limit"""
+        values = self._rows.keys()
+        if limit is None or limit < 0:
+            return list(values)
+        return [value for value, _ in zip(values, range(limit))]
+
+    def types(self) -> set:
+        """Returns the types of the not NULL values"""
+        return {type(value) for value in self._rows if value is not None}
+
+    def sortedValues(self) -> list:
+        """Returns the distinct not NULL values in ascending order"""
+        if self._sorted is None:
+            self._sorted = sorted(
+                (value for value in self._rows if value is not None), key=FrostAttributeIndex.sortKey)
+        return self._sorted
+
+    def minimum(self):
+        """Returns the minimum not NULL value, None if all NULL"""
+        values = self.sortedValues()
+        return values[0] if values else None
+
+    def maximum(self):
+        """Returns the maximum not NULL value, None if all NULL"""
+        values = self.sortedValues()
+        return values[-1] if values else None
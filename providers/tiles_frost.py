@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+"""SensorThings API Plugin
+
+Description
+-----------
+
+Tile grid and LRU tile cache for the Frost Provider lazy loading mode.
+
+Libraries/Modules
+-----------------
+
+- None.
+
+Notes
+-----
+
+- Tiles are squares of a fixed size (in degrees, EPSG:4326) snapped
+  to a global grid; each tile remembers the keys of its loaded features.
+
+
+Author(s)
+---------
+
+- Created by the SensorThingsAPI plugin contributors on 18/10/2026,
+  as part of the Frost provider performance work.
+
+Members
+-------
+"""
+import math
+from collections import OrderedDict
+
+from qgis.core import QgsRectangle
+
+
+#
+#-----------------------------------------------------------
+class FrostTileCache:
+    """LRU cache of loaded tiles"""
+
+    #: Extent of the tile grid (EPSG:4326)
+    GRID_EXTENT = QgsRectangle(-180.0, -90.0, 180.0, 90.0)
+
+    def __init__(self, tile_size: float, max_tiles: int, max_features: int):
+        """Constructor"""
+        self._tile_size = float(tile_size)
+        self._max_tiles = max(int(max_tiles), 1)
+        self._max_features = max(int(max_features), 1)
+        # tile key => set of feature keys (in LRU order)
+        self._tiles = OrderedDict()
+        # feature key => number of loaded tiles containing it
+        self._refs = {}
+
+    @property
+    def tileSize(self) -> float:
+        """Returns the tile size"""
+        return self._tile_size
+
+    @property
+    def maxTiles(self) -> int:
+        """Returns the maximum number of cached tiles"""
+        return self._max_tiles
+
+    def clear(self):
+        """Removes all tiles"""
+        self._tiles.clear()
+        self._refs.clear()
+
+    def tileRange(self, rect: QgsRectangle):
+        """Returns the (ix_min, ix_max, iy_min, iy_max) index range of the
+           grid tiles covering a rectangle, None if outside of the grid"""
+        if rect is None or rect.isNull():
+            return None
+        rect = rect.intersect(self.GRID_EXTENT)
+        if rect.isNull():
+            return None
+
+        size = self._tile_size
+        ix_min = int(math.floor((rect.xMinimum() - self.GRID_EXTENT.xMinimum()) / size))
+        ix_max = int(math.floor((rect.xMaximum() - self.GRID_EXTENT.xMinimum()) / size))
+        iy_min = int(math.floor((rect.yMinimum() - self.GRID_EXTENT.yMinimum()) / size))
+        iy_max = int(math.floor((rect.yMaximum() - self.GRID_EXTENT.yMinimum()) / size))
+        return ix_min, ix_max, iy_min, iy_max
+
+    def tileCount(self, rect: QgsRectangle) -> int:
+        """Returns the number of grid tiles covering a rectangle"""
+        tile_range = self.tileRange(rect)
+        if tile_range is None:
+            return 0
+        ix_min, ix_max, iy_min, iy_max = tile_range
+        return (ix_max - ix_min + 1) * (iy_max - iy_min + 1)
+
+    def tilesOf(self, rect: QgsRectangle, limit: int=None) -> list:
+        """Returns the keys of the grid tiles covering a rectangle; if more
+           than limit, only the nearest ones to the center tile (by rings
+           around it, without enumerating the whole range)"""
+        tile_range = self.tileRange(rect)
+        if tile_range is None:
+            return []
+        ix_min, ix_max, iy_min, iy_max = tile_range
+        if limit is None or self.tileCount(rect) <= limit:
+            return [(ix, iy) for ix in range(ix_min, ix_max + 1) for iy in range(iy_min, iy_max + 1)]
+
+        # rings of tiles around the center one, clipped to the range
+        limit = max(int(limit), 0)
+        ix_center = (ix_min + ix_max) // 2
+        iy_center = (iy_min + iy_max) // 2
+        keys = []
+        radius = 0
+        while len(keys) < limit:
+            for ix in range(max(ix_center - radius, ix_min), min(ix_center + radius, ix_max) + 1):
+                on_border = abs(ix - ix_center) == radius
+                for iy in ((iy_center - radius, iy_center + radius) if radius and not on_border else
+                           range(iy_center - radius, iy_center + radius + 1)):
+                    if iy_min <= iy <= iy_max:
+                        keys.append((ix, iy))
+                        if len(keys) >= limit:
+                            return keys
+            radius += 1
+        return keys
+
+    def tileRect(self, key) -> QgsRectangle:
+        """Returns the rectangle of a tile"""
+        ix, iy = key
+        size = self._tile_size
+        x = self.GRID_EXTENT.xMinimum() + ix * size
+        y = self.GRID_EXTENT.yMinimum() + iy * size
+        return QgsRectangle(x, y, x + size, y + size)
+
+    def contains(self, key) -> bool:
+        """Returns true if a tile is loaded"""
+        return key in self._tiles
+
+    def hasFeature(self, feature_key) -> bool:
+        """Returns true if a feature belongs to a loaded tile"""
+        return feature_key in self._refs
+
+    def featureCount(self) -> int:
+        """Returns the number of distinct loaded features"""
+        return len(self._refs)
+
+    def add(self, key, feature_keys):
+        """Marks a tile as loaded with its feature keys"""
+        if key in self._tiles:
+            self.touch([key])
+            return
+        feature_keys = set(feature_keys)
+        self._tiles[key] = feature_keys
+        for feature_key in feature_keys:
+            self._refs[feature_key] = self._refs.get(feature_key, 0) + 1
+
+    def touch(self, keys):
+        """Marks tiles as recently used"""
+        for key in keys:
+            if key in self._tiles:
+                self._tiles.move_to_end(key)
+
+    def evict(self, protected=None) -> list:
+        """Removes least recently used tiles over the memory caps,
+           returns the feature keys no longer loaded"""
+        protected = set(protected or [])
+        released = []
+        for key in list(self._tiles.keys()):
+            if len(self._tiles) <= self._max_tiles and len(self._refs) <= self._max_features:
+                break
+            if key in protected:
+                continue
+            for feature_key in self._tiles.pop(key):
+                count = self._refs.get(feature_key, 0) - 1
+                if count > 0:
+                    self._refs[feature_key] = count
+                else:
+                    self._refs.pop(feature_key, None)
+                    released.append(feature_key)
+        return released